@@ -133,84 +133,57 @@ if st.button("Scrape Data"):
         '''
 import streamlit as st
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+from parser_backends import SELECTOLAX_BACKEND, make_soup, make_selectolax_tree
+from field_extractor import extract_fields, extract_fields_selectolax
+from sites import SITES
+from ui_cache import CACHE_TTL, IncompleteListing, cache_controls, crawl_date, site_engine
 from io import BytesIO
 import csv
 
-def parse_html(file_content, title_css, date_css, tags_css, paragraph_css, companies_css):
+def parse_html(file_content, title_css, date_css, tags_css, paragraph_css, companies_css, backend=None):
     """
     Parse HTML content and extract article details.
     """
-    soup = BeautifulSoup(file_content, "html.parser")
-
-    # Extracting the data using provided CSS selectors
-    title = soup.select_one(title_css).get_text(strip=True) if soup.select_one(title_css) else None
-    date = soup.select_one(date_css).get_text(strip=True) if soup.select_one(date_css) else None
-
-    # Extract tags
-    tags_div = soup.select_one(tags_css)
-    tags = [a.get_text(strip=True) for a in tags_div.select('a') if a.get_text(strip=True) != "More"] if tags_div else []
-
-    # Locate the first paragraph
-    paragraph = soup.select_one(paragraph_css).get_text(strip=True) if soup.select_one(paragraph_css) else None
-
-    # Extract related companies
-    companies = [company.get_text(strip=True) for company in soup.select(companies_css)] if soup.select(companies_css) else []
+    spec = {
+        "title": (title_css, "text"),
+        "date": (date_css, "text"),
+        "tags": (tags_css, "link_texts"),
+        "paragraph": (paragraph_css, "text"),  # Locate the first paragraph
+        "companies": (companies_css, "texts"),  # Extract related companies
+    }
+    if backend == SELECTOLAX_BACKEND:
+        fields = extract_fields_selectolax(make_selectolax_tree(file_content), spec)
+    else:
+        # Every selector is compiled once and reused across pages
+        fields = extract_fields(make_soup(file_content, backend), spec)
 
     return {
-        "Title": title,
-        "Date": date,
-        "Tags": ', '.join(tags),
-        "Introductory Paragraph": paragraph,
-        "Related Companies": ', '.join(companies)
+        "Title": fields["title"],
+        "Date": fields["date"],
+        "Tags": ', '.join(fields["tags"]),
+        "Introductory Paragraph": fields["paragraph"],
+        "Related Companies": ', '.join(fields["companies"])
     }
 
-def scrape_commercial_search(pages, property_type):
-    base_url = f"https://www.commercialsearch.com/news/{property_type}/"
-    data = []
-    for page in range(1, pages + 1):
-        url = base_url if page == 1 else f"{base_url}page/{page}/"
-        print(f"Fetching URL: {url}")  # Log URL
-        response = requests.get(url)
-        print(f"Response Status Code: {response.status_code}")  # Log status code
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, "html.parser")
-            print(f"HTML Content (Partial): {soup.prettify()[:1000]}")  # Log partial HTML
-            articles = soup.find_all('article')
-            print(f"Number of articles found: {len(articles)}")  # Log article count
-            for article in articles:
-                title = article.find('h2').text.strip() if article.find('h2') else ""
-                link = article.find('a')['href'] if article.find('a') else ""
-                date = article.find('time')['datetime'] if article.find('time') else ""
-                intro = article.find('p').text.strip() if article.find('p') else ""
-                data.append([title, date, link, "", "", intro, "", "", ""])
-        else:
-            print(f"Failed to fetch URL: {url}")
-            st.warning(f"Failed to access {url}. Status Code: {response.status_code}")
-    return data
-
-
-def scrape_traded(pages):
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def scrape_site(site_name, pages, property_type=None, day=None):
     """
-    Function to scrape Traded articles.
+    Function to scrape the listing cards of any site in `SITES` for a specific property type.
+    Results are cached per site, property type, page count and crawl date (`day`).
+    Only complete scrapes are cached; anything else raises IncompleteListing.
     """
-    base_url = "https://traded.co/page/"
+    engine = site_engine(site_name)
     data = []
-    for page in range(1, pages + 1):
-        url = f"{base_url}{page}/"
-        response = requests.get(url)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, "html.parser")
-            articles = soup.find_all('div', {'class': 'content-card'})
-            for article in articles:
-                title = article.find('h2').text.strip() if article.find('h2') else ""
-                link = article.find('a')['href'] if article.find('a') else ""
-                date = article.find('span', {'class': 'date'}).text.strip() if article.find('span', {'class': 'date'}) else ""
-                intro = article.find('p').text.strip() if article.find('p') else ""
-                data.append([title, date, link, "", "", intro, "", "", ""])
-        else:
-            st.warning(f"Failed to access Traded page {page}.")
+    errors = []
+    for url, cards, error in engine.cards(engine.listing_urls(property_type, pages)):
+        print(f"Fetched URL: {url}, articles found: {len(cards)}")  # Log URL and article count
+        if error:
+            errors.append(f"Failed to access {url}. {error}")
+            continue
+        for card in cards:
+            data.append([card["title"], card["date"], card["link"], "", "", card["intro"], "", "", ""])
+    if errors or not data:
+        raise IncompleteListing(data, errors)
     return data
 
 def create_csv(data):
@@ -230,36 +203,37 @@ st.title("Web Scraper for Real Estate Websites")
 
 website_choice = st.selectbox(
     "Select a website to scrape:",
-    ("Multi-Housing News", "Commercial Search", "Traded")
+    list(SITES.keys())
 )
 
 property_type = None
-if website_choice == "Multi-Housing News":
+if SITES[website_choice].categories:
     property_type = st.selectbox(
         "Select a property type:",
-        ["market-rate", "luxury", "affordable-housing", "student-housing", "senior-housing", 
-         "manufactured-housing", "condo", "military-housing", "self-storage", "single-family-rental"]
-    )
-elif website_choice == "Commercial Search":
-    property_type = st.selectbox(
-        "Select a property type:",
-        ["office", "industrial", "retail", "medical-office", "coworking", "data-centers"]
+        list(SITES[website_choice].categories.keys())
     )
 
 pages = st.number_input("Number of pages to scrape:", min_value=1, max_value=100, value=1, step=1)
 
+# Scraped data is kept per session and cached per process, so widget changes and downloads do not scrape again
+cache_controls(scrape_site.clear, lambda: st.session_state.pop("scraped_data", None))
+
 if st.button("Scrape Data"):
     st.info("Scraping data... Please wait.")
-    if website_choice == "Multi-Housing News" and property_type:
-        data = scrape_multihousing_news(pages, property_type)
-    elif website_choice == "Commercial Search" and property_type:
-        data = scrape_commercial_search(pages, property_type)
-    elif website_choice == "Traded":
-        data = scrape_traded(pages)
+    if property_type or not SITES[website_choice].categories:
+        try:
+            st.session_state["scraped_data"] = scrape_site(website_choice, pages, property_type, crawl_date())
+        except IncompleteListing as listing:
+            # Shown on every incomplete scrape; the next click scrapes again instead of reusing this one
+            for error in listing.errors:
+                st.warning(error)
+            st.session_state["scraped_data"] = listing.result
     else:
         st.error("Please select a property type for the selected website.")
-        data = []
+        st.session_state["scraped_data"] = []
 
+if "scraped_data" in st.session_state:
+    data = st.session_state["scraped_data"]
     if data:
         st.success(f"Scraped {len(data)} articles.")
         csv_file = create_csv(data)
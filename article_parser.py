@@ -0,0 +1,337 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from classifier import load_classifier
+from dedup import hash_file
+from field_extractor import article_field_spec, extract_fields, extract_fields_selectolax, scope_strainer
+from parse_cache import ParseCache
+from parser_backends import SELECTOLAX_BACKEND, make_soup, make_selectolax_tree
+
+# Classification rules for asset type, region and metadata paragraphs (see classifier.py)
+CLASSIFIER = load_classifier()
+
+# Define asset type keywords
+ASSET_TYPE_KEYWORDS = CLASSIFIER.asset_types
+
+# Column order of the exported spreadsheet
+COLUMN_ORDER = [
+    "Article Title", "Article URL", "Original URL", "Category", "Date Published", "Tags", "Region", "Asset Type",
+    "Intro Paragraph", "Company", "Related Companies", "Transaction Amount", "Transaction Amount (USD)",
+    "Square Footage", "Asset Descriptor"
+]
+
+# Region of an article page that holds the post body; paragraphs are taken from it
+CONTENT_CSS = ".fl-post-content"
+
+# Regexes for the transaction details found in the intro paragraphs
+AMOUNT_PATTERN = r'\$(\d{1,3}(?:,\d{3})*(?:\.\d{2})?) million'
+SIZE_PATTERN = r'(\d{1,3}(?:,\d{3})*)-square-foot'
+LOCATION_PATTERN = r'\b(?:in|near)\s+([A-Za-z\s,]+)'
+
+# Version of the extraction logic; bump it whenever parsing or extraction changes
+# so cached records from older code are parsed again
+EXTRACTOR_VERSION = 3
+
+# Parse cache key: records also depend on the classification rules in use
+PARSE_CACHE_VERSION = [EXTRACTOR_VERSION, CLASSIFIER.fingerprint]
+
+# Parsed records written to the parse cache per transaction, and run through
+# the vectorized transaction extraction at once
+CACHE_BATCH_SIZE = 100
+
+# Number of parse worker processes used when the caller does not choose
+PARSE_WORKERS = os.cpu_count() or 1
+
+# Function to extract asset type
+def extract_asset_type(tags):
+    """Extract the asset type from the tags based on predefined keywords."""
+    return CLASSIFIER.asset_type(tags)  # Case-insensitive match, None if no match is found
+
+# Function to extract the raw article fields with the chosen parser backend
+def extract_article_fields(markup, title_css, date_css, tags_css, companies_css, backend=None):
+    """Return title, date, tags, companies and the first two content paragraphs of an article page.
+
+    Paragraphs come from the post body (CONTENT_CSS). With BeautifulSoup only
+    the subtrees the selectors need are built; pages without a post body are
+    parsed in full and paragraphs are taken from anywhere, as before.
+    """
+    spec = article_field_spec(title_css, date_css, tags_css, companies_css, paragraph_css=f"{CONTENT_CSS} p")
+    if backend == SELECTOLAX_BACKEND:
+        tree = make_selectolax_tree(markup)
+        if tree.css_first(CONTENT_CSS) is None:
+            spec = article_field_spec(title_css, date_css, tags_css, companies_css)
+        fields = extract_fields_selectolax(tree, spec, is_content_paragraph)
+    else:
+        strainer = scope_strainer(spec)
+        soup = make_soup(markup, backend, parse_only=strainer)
+        if soup.select_one(CONTENT_CSS) is None:
+            spec = article_field_spec(title_css, date_css, tags_css, companies_css)
+            if strainer is not None:
+                soup = make_soup(markup, backend)
+        fields = extract_fields(soup, spec, is_content_paragraph)
+
+    # Extract the first two meaningful paragraphs
+    paragraphs = fields["paragraphs"] + [None, None]
+    return fields["title"], fields["date"], fields["tags"], fields["companies"], paragraphs[0], paragraphs[1]
+
+# Function to parse HTML files
+def parse_html_file(file_path, title_css, date_css, tags_css, companies_css, original_url=None, backend=None,
+                    transactions=True):
+    """Parse an HTML file and extract article details along with transaction information."""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        markup = file.read()
+    return parse_article(markup, title_css, date_css, tags_css, companies_css, file_path, original_url, backend,
+                         transactions)
+
+# Function to parse article HTML that is already in memory
+def parse_article(markup, title_css, date_css, tags_css, companies_css, article_url, original_url=None, backend=None,
+                  transactions=True):
+    """Extract article details along with transaction information from HTML markup.
+
+    With `transactions=False` the transaction fields are left empty, for
+    callers that fill them in batches with `add_transaction_info`.
+    """
+    title, date, tags, companies, first_paragraph, second_paragraph = extract_article_fields(
+        markup, title_css, date_css, tags_css, companies_css, backend
+    )
+   
+    # Combine the first and second paragraphs for transaction extraction
+    combined_paragraphs = (first_paragraph or '') + ' ' + (second_paragraph or '')
+ 
+    # Extract transaction information using regex from the combined paragraphs
+    transaction_info = extract_transaction_info(combined_paragraphs) if transactions else {}
+
+    # Extract region from tags
+    region = extract_region(tags)
+
+    # Extract asset type from tags
+    asset_type = extract_asset_type(tags)
+ 
+    return {
+        "Article Title": title,
+        "Article URL": article_url,  # Use the file path (or the link when nothing was saved) as the URL
+        "Original URL": original_url,  # Add the original URL
+        "Date Published": date,
+        "Tags": ', '.join(tags),
+        "Region": region,  # Add region to the return dictionary
+        "Asset Type": asset_type,  # Add asset type to the return dictionary
+        "Intro Paragraph": second_paragraph,  # Use the first paragraph as the intro
+        "Company": None,  # Placeholder for Company (you can update this logic if needed)
+        "Related Companies": ', '.join(companies),
+        "Transaction Amount": transaction_info.get("Transaction Amount"),
+        "Transaction Amount (USD)": transaction_info.get("Transaction Amount (USD)"),
+        "Square Footage": transaction_info.get("Square Footage"),
+        "Asset Descriptor": ', '.join(transaction_info.get("Asset Descriptor", [])),
+        "Combined Paragraphs": combined_paragraphs,  # Kept so the transaction fields can be re-extracted without the HTML
+    }
+
+# Function to extract region
+def extract_region(tags):
+    """Extract region from tags."""
+    return CLASSIFIER.region(tags)  # "Unknown" if no region is found in tags
+
+# Function to check if a paragraph is content
+def is_content_paragraph(text):
+    """Determine if a paragraph is likely to be content rather than metadata."""
+    # Skip paragraphs that are too short or contain typical metadata keywords
+    return CLASSIFIER.is_content(text)
+ 
+# Function to extract transaction information
+def extract_transaction_info(paragraphs):
+    """Extract transaction information using regex from combined paragraphs."""
+    extracted_info = {
+        "Transaction Amount": None,
+        "Transaction Amount (USD)": None,
+        "Square Footage": None,
+        "Asset Descriptor": [],
+        "Companies Involved": []
+    }
+ 
+    if not paragraphs:
+        return extracted_info  # Return empty info if no paragraphs
+ 
+    # Find transaction amount
+    amount_match = re.search(AMOUNT_PATTERN, paragraphs)
+    if amount_match:
+        extracted_info["Transaction Amount"] = amount_match.group(0)
+        extracted_info["Transaction Amount (USD)"] = float(amount_match.group(1).replace(',', '')) * 1e6
+ 
+    # Find square footage
+    size_match = re.search(SIZE_PATTERN, paragraphs)
+    if size_match:
+        extracted_info["Square Footage"] = int(size_match.group(1).replace(',', ''))
+ 
+    # Find geographic locations and companies mentioned
+    locations = re.findall(LOCATION_PATTERN, paragraphs)
+    if locations:
+        extracted_info["Asset Descriptor"] = list(dict.fromkeys(loc.strip() for loc in locations))  # Unique, in text order
+ 
+    return extracted_info
+
+# Function to extract transaction information for many articles at once
+def extract_transactions(paragraphs):
+    """Vectorized `extract_transaction_info` over a Series of combined paragraphs.
+
+    Returns a DataFrame on the same index with "Transaction Amount" (the
+    matched text), numeric "Transaction Amount (USD)" and "Square Footage",
+    and "Asset Descriptor" (comma-joined), matching the per-article fields.
+    """
+    paragraphs = paragraphs.fillna('').astype(str)
+    amounts = paragraphs.str.extract('(' + AMOUNT_PATTERN + ')')
+    sizes = paragraphs.str.extract(SIZE_PATTERN)[0]
+    locations = paragraphs.str.findall(LOCATION_PATTERN)
+    return pd.DataFrame({
+        "Transaction Amount": amounts[0],
+        "Transaction Amount (USD)": amounts[1].str.replace(',', '', regex=False).astype(float) * 1e6,
+        "Square Footage": pd.to_numeric(sizes.str.replace(',', '', regex=False)).astype("Int64"),
+        "Asset Descriptor": locations.map(lambda found: ', '.join(dict.fromkeys(loc.strip() for loc in found))),
+    }, index=paragraphs.index)
+
+# Function to fill the transaction fields of parsed records in one pass
+def add_transaction_info(records):
+    """Set the transaction fields of `records` from their "Combined Paragraphs" and return them."""
+    if not records:
+        return records
+    info = extract_transactions(pd.Series([record.get("Combined Paragraphs") for record in records], dtype=object))
+    info = info.astype(object).where(info.notna(), None)
+    for record, values in zip(records, info.to_dict('records')):
+        record.update(values)
+    return records
+
+# Function to parse one file inside a worker process
+def _parse_job(job):
+    """Unpack a job tuple for `parse_html_file` (top-level so the process pool can pickle it)."""
+    filename, file_path, selectors, original_url, backend = job
+    started = time.perf_counter()
+    article_data = parse_html_file(file_path, *selectors, original_url, backend, transactions=False)
+    article_data["File Name"] = filename  # Add the filename to the data
+    article_data["_parse_seconds"] = time.perf_counter() - started  # Measured in the worker, popped by the caller
+    return article_data
+
+# Function to run parse jobs serially or on a process pool
+def _run_parse_jobs(jobs, workers):
+    """Yield `_parse_job` results in job order, spreading the work over `workers` processes."""
+    if workers > 1 and len(jobs) > 1:
+        workers = min(workers, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields results in submission order, which keeps the output stable
+            yield from executor.map(_parse_job, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+    else:
+        for job in jobs:
+            yield _parse_job(job)
+
+# Function to parse all HTML files in a directory one record at a time
+def iter_parsed_records(directory, title_css, date_css, tags_css, companies_css, original_urls=None,
+                        skip_files=(), workers=1, progress_callback=None, backend=None, use_cache=False,
+                        metrics=None):
+    """Yield one record per HTML file in `directory`, in sorted filename order.
+
+    Records are produced as they are parsed, so callers can export them
+    without holding the whole corpus in memory. With `workers` > 1 files are
+    spread over a process pool; rows still come back in the same order.
+    `progress_callback(done, total)` is called after each file. `backend`
+    picks the HTML parser (see parser_backends). With `use_cache`, records of
+    files whose content was parsed before by the same EXTRACTOR_VERSION,
+    classification rules, selectors and backend are read back instead of
+    re-parsed. Transaction fields are extracted per batch of CACHE_BATCH_SIZE
+    records from the stored paragraphs, so cached records pick up regex
+    changes without re-parsing.
+    A `RunMetrics` as `metrics` records the parse time of each article.
+    """
+    original_urls = original_urls or {}
+    selectors = (title_css, date_css, tags_css, companies_css)
+    jobs = [
+        # Retrieve the original URL from the mapping, falling back to "Unknown" if not found
+        (filename, os.path.join(directory, filename), selectors, original_urls.get(filename, "Unknown"), backend)
+        for filename in sorted(os.listdir(directory))
+        if filename.endswith('.html') and filename not in skip_files
+    ]
+    total = len(jobs)
+
+    # Only files whose content is not in the parse cache need parsing
+    cache = None
+    hashes = []
+    misses = set(range(total))
+    if use_cache:
+        cache = ParseCache(directory, PARSE_CACHE_VERSION, selectors, backend)
+        hashes = [hash_file(job[1]) for job in jobs]
+        known = cache.cached_hashes()
+        misses = {position for position in range(total) if hashes[position] not in known}
+    parsed = _run_parse_jobs([job for position, job in enumerate(jobs) if position in misses], workers)
+
+    new_records = []
+    batch = []
+    try:
+        for position, (filename, file_path, _, original_url, _) in enumerate(jobs):
+            if position in misses:
+                record = next(parsed)
+                parse_seconds = record.pop("_parse_seconds")
+                if metrics is not None:
+                    metrics.observe("parse", parse_seconds)
+                if cache is not None:
+                    new_records.append((hashes[position], record))
+                    if len(new_records) >= CACHE_BATCH_SIZE:
+                        cache.put_many(new_records)
+                        new_records = []
+            else:
+                record = cache.get(hashes[position])
+                if metrics is not None:
+                    metrics.count("parse cache hits")
+                record.update({"Article URL": file_path, "Original URL": original_url, "File Name": filename})
+            batch.append(record)
+            if progress_callback:
+                progress_callback(position + 1, total)
+            if len(batch) >= CACHE_BATCH_SIZE or position == total - 1:
+                yield from add_transaction_info(batch)
+                batch = []
+    finally:
+        parsed.close()
+        if cache is not None:
+            cache.put_many(new_records)
+            cache.close()
+
+# Function to parse all HTML files in a directory
+def parse_html_files(directory, title_css, date_css, tags_css, companies_css, original_urls=None,
+                     skip_files=(), workers=1, progress_callback=None, column_order=COLUMN_ORDER, backend=None,
+                     use_cache=False):
+    """Main function to parse all HTML files in the specified directory.
+
+    Same options as `iter_parsed_records`; the records are collected into a
+    DataFrame that is identical whether they were parsed serially, in
+    parallel or read from the cache.
+    """
+    records = iter_parsed_records(directory, title_css, date_css, tags_css, companies_css, original_urls,
+                                  skip_files, workers, progress_callback, backend, use_cache)
+    return records_to_dataframe(list(records), column_order)
+
+# Function to build the export DataFrame
+def records_to_dataframe(records, column_order=COLUMN_ORDER):
+    """Convert parsed article records to a DataFrame with the export columns in order."""
+    # Convert the list of dictionaries to a DataFrame
+    df = pd.DataFrame(records, columns=COLUMN_ORDER + ["File Name"])
+
+    # Reorder the columns as per the specified order
+    return df[column_order]
+
+# Function to check that a parser backend extracts the same fields as html.parser
+def compare_backends(file_paths, title_css, date_css, tags_css, companies_css, backend, reference="html.parser"):
+    """Parse each file with `reference` and `backend` and return the fields that differ.
+
+    Each mismatch is a dict with the file, field name and both values; an empty
+    list means the backend is a drop-in replacement for these files.
+    """
+    field_names = ["title", "date", "tags", "companies", "first_paragraph", "second_paragraph"]
+    mismatches = []
+    for file_path in file_paths:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            markup = file.read()
+        expected = extract_article_fields(markup, title_css, date_css, tags_css, companies_css, reference)
+        actual = extract_article_fields(markup, title_css, date_css, tags_css, companies_css, backend)
+        for field, want, got in zip(field_names, expected, actual):
+            if want != got:
+                mismatches.append({"file": file_path, "field": field, reference: want, backend: got})
+    return mismatches
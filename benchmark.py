@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+
+from crawler import CrawlSettings, run_crawl
+from jobs import FINISHED, Job
+from sites import COMMERCIAL_SEARCH
+from standin_site import SiteConfig, StandInServer
+
+# Results of every run are appended here as one JSON line, to compare commits
+BENCH_OUTPUT = "bench_output.txt"
+
+
+# Function to read the peak memory use so far
+def peak_rss_mb():
+    """Peak resident set size in MB of this process and of its finished children (parse workers), or None."""
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in bytes on macOS, KB elsewhere
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return round(max(self_rss, children_rss) / 1e6, 1)
+
+
+# Function to name the code being measured
+def git_commit():
+    """Short hash of the checked-out commit (with "+" when the tree has changes), or None outside git."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=directory,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=directory,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("+" if dirty else "")
+
+
+# Function to run one measured crawl (the target of run_benchmark's crawl process)
+def measured_crawl(settings):
+    """Crawl with `settings` and return the job's outcome, elapsed seconds and peak RSS."""
+    job = Job(1, "benchmark")
+    started = time.perf_counter()
+    job.run(run_crawl, settings)
+    return {
+        "status": job.status, "error": job.error, "counts": dict(job.counts),
+        "metrics": job.metrics.to_dict() if job.metrics is not None else None,
+        "seconds": time.perf_counter() - started, "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# Function to run one benchmark crawl
+def run_benchmark(config, settings, directory):
+    """Crawl a stand-in site described by `config` with `settings` and return the measurements.
+
+    The crawl runs in a fresh process, a sibling of the server's, so its peak
+    RSS covers the crawl and its parse workers only, not the server or
+    earlier runs.
+    """
+    with StandInServer(config) as server:
+        site = server.site_for(settings.site)
+        labels = [label for label, slug in site.categories.items() if slug in config.categories]
+        with ProcessPoolExecutor(max_workers=1) as runner:
+            run = runner.submit(
+                measured_crawl, settings._replace(site=site, categories=labels, pages=config.pages, directory=directory)
+            ).result()
+        served = requests.get(f"{server.base_url}/__stats", timeout=10).json()["status_codes"]
+    if run["status"] != FINISHED:
+        raise RuntimeError(f"Benchmark crawl {run['status']}: {run['error']}")
+
+    counts, elapsed = run["counts"], run["seconds"]
+    metrics = run["metrics"]
+    download = metrics["stages"].get("download", {})
+    parse = metrics["stages"].get("parse", {})
+    milliseconds = {name: round(download[f"{name}_seconds"] * 1000, 1) if download.get(f"{name}_seconds") is not None else None
+                    for name in ("p50", "p99")}
+    return {
+        "articles": counts.get("parsed", 0),
+        "errors": counts.get("errors", 0),
+        "seconds": round(elapsed, 2),
+        "articles_per_second": round(counts.get("parsed", 0) / elapsed, 2) if elapsed else None,
+        "download_p50_ms": milliseconds["p50"],
+        "download_p99_ms": milliseconds["p99"],
+        "parse_mean_ms": round(parse["mean_seconds"] * 1000, 2) if parse.get("mean_seconds") is not None else None,
+        "peak_rss_mb": run["peak_rss_mb"],
+        "served_status_codes": served,
+        "client_status_codes": metrics["status_codes"],
+        "retries": metrics["counts"]["retries"],
+    }
+
+
+# Function to build the argument parser
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Crawl a local stand-in of Commercial Search end to end and report throughput, latency and memory."
+    )
+    parser.add_argument("--categories", type=int, default=2, help="number of categories to serve and crawl")
+    parser.add_argument("--pages", type=int, default=5, help="listing pages per category (10 articles each)")
+    parser.add_argument("--corpus", help="directory of recorded article HTML files to serve instead of synthetic pages")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.05, help="up to this many extra seconds at random")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="share of requests answered 500/502/503")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds of injected 429/503s")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the fault injection and synthetic pages")
+    parser.add_argument("--per-host-limit", type=int, default=8, help="maximum simultaneous downloads per host")
+    parser.add_argument("--delay", type=float, default=0.0, help="pause after each download per connection")
+    parser.add_argument("--max-rate", type=float, help="cap of each host's adaptive request rate (requests/s)")
+    parser.add_argument("--parse-workers", type=int, help="number of parse worker processes")
+    parser.add_argument("--backend", help="HTML parser backend")
+    parser.add_argument("--pipelined", action="store_true", help="parse each article as it downloads")
+    parser.add_argument("--repeat", type=int, default=1, help="number of runs, each in a fresh directory")
+    parser.add_argument("--output", default=BENCH_OUTPUT, help="file the JSON results are appended to ('' to skip)")
+    return parser
+
+
+# Function to run the benchmark from the command line
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    slugs = list(COMMERCIAL_SEARCH.categories.values())[:max(1, args.categories)]
+    config = SiteConfig(slugs, args.pages, args.corpus, args.latency, args.jitter, args.rate_429, args.rate_5xx,
+                        args.retry_after, args.seed)
+    # Cold runs: every page is fetched and parsed, nothing comes from the HTTP or parse cache
+    settings = CrawlSettings(
+        COMMERCIAL_SEARCH, [], args.pages, None, export_format="CSV (.csv)", per_host_limit=args.per_host_limit,
+        request_delay=args.delay, use_http_cache=False, use_parse_cache=False, pipelined=args.pipelined,
+    )
+    overrides = {"parse_workers": args.parse_workers, "parser_backend": args.backend, "max_rate": args.max_rate}
+    settings = settings._replace(**{name: value for name, value in overrides.items() if value is not None})
+
+    commit = git_commit()
+    for run in range(1, args.repeat + 1):
+        with tempfile.TemporaryDirectory(prefix="scraper-bench-") as directory:
+            try:
+                result = run_benchmark(config, settings, directory)
+            except Exception as e:
+                print(f"Run {run} failed: {e}", file=sys.stderr)
+                return 1
+        print(
+            f"Run {run}: {result['articles']} articles in {result['seconds']}s = {result['articles_per_second']} articles/s, "
+            f"download p50 {result['download_p50_ms']} ms / p99 {result['download_p99_ms']} ms, "
+            f"parse mean {result['parse_mean_ms']} ms, peak RSS {result['peak_rss_mb']} MB, "
+            f"{result['errors']} errors, {result['retries']} retries"
+        )
+        if args.output:
+            entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "run": run,
+                     "site": config._asdict(), "pipelined": args.pipelined, "parse_workers": settings.parse_workers,
+                     "backend": settings.parser_backend, "per_host_limit": settings.per_host_limit,
+                     "max_rate": settings.max_rate, **result}
+            with open(args.output, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+#process to run (compare the lines appended to bench_output.txt between commits):
+# python benchmark.py --categories 2 --pages 5 --latency 0.05 --rate-429 0.02 --rate-5xx 0.01
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+# Environment variable naming a JSON file that overrides the built-in rules
+RULES_ENV_VAR = "SCRAPER_CLASSIFIER_RULES"
+
+# Built-in rules; a JSON config file with any of these keys replaces the matching entry
+DEFAULT_RULES = {
+    # Asset types in priority order: the first keyword found in a tag wins
+    "asset_types": ["Office", "Industrial", "Retail", "Medical Office", "Coworking", "Data Centers"],
+    # Tags that name a region exactly
+    "regions": ["Northeast", "West", "Southwest", "Southeast", "Midwest", "Mid-Atlantic"],
+    # Paragraphs containing any of these (case-insensitive) are metadata, not content
+    "metadata_keywords": ["by", "posted on", "updated", "author", "date", "category", "tags"],
+    # Paragraphs shorter than this are never content
+    "min_paragraph_length": 20,
+}
+
+
+# Function to compile a keyword list into one case-insensitive pattern
+def _keyword_pattern(keywords, lookahead=False):
+    """Join `keywords` into a single alternation; `lookahead` reports every start position."""
+    if not keywords:
+        return None
+    alternation = "|".join(re.escape(keyword) for keyword in keywords)
+    return re.compile(f"(?=({alternation}))" if lookahead else alternation, re.IGNORECASE)
+
+
+class Classifier:
+    """Tag and paragraph classification rules, compiled once into combined patterns.
+
+    Per-tag answers are memoized, since the same tags recur across thousands
+    of articles.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = {**DEFAULT_RULES, **(rules or {})}
+        self.asset_types = list(self.rules["asset_types"])
+        self.regions = frozenset(self.rules["regions"])
+        self.min_paragraph_length = self.rules["min_paragraph_length"]
+        # Rules that change the output change the parse cache key
+        self.fingerprint = hashlib.sha1(json.dumps(self.rules, sort_keys=True).encode('utf-8')).hexdigest()
+
+        self._priority = {}
+        for position, keyword in enumerate(self.asset_types):
+            self._priority.setdefault(keyword.lower(), position)
+        self._asset_pattern = _keyword_pattern(self.asset_types, lookahead=True)
+        self._metadata_pattern = _keyword_pattern(self.rules["metadata_keywords"])
+        self.tag_asset_type = lru_cache(maxsize=4096)(self._tag_asset_type)
+
+    @classmethod
+    def from_file(cls, path):
+        """Build a classifier from a JSON file holding any of the DEFAULT_RULES keys."""
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls(json.load(file))
+
+    def _tag_asset_type(self, tag):
+        """Return the highest-priority asset type keyword contained in `tag`, or None."""
+        if self._asset_pattern is None:
+            return None
+        positions = [self._priority.get(match.group(1).lower()) for match in self._asset_pattern.finditer(tag)]
+        positions = [position for position in positions if position is not None]
+        return self.asset_types[min(positions)] if positions else None
+
+    def asset_type(self, tags):
+        """Return the asset type of the first tag that mentions one, or None."""
+        for tag in tags:
+            asset_type = self.tag_asset_type(tag)
+            if asset_type:
+                return asset_type
+        return None
+
+    def region(self, tags):
+        """Return the first tag that is a region, or "Unknown"."""
+        for tag in tags:
+            if tag in self.regions:
+                return tag
+        return "Unknown"
+
+    def is_content(self, text):
+        """Return True when a paragraph looks like article content rather than metadata."""
+        if len(text) < self.min_paragraph_length:
+            return False
+        return self._metadata_pattern is None or not self._metadata_pattern.search(text)
+
+
+# Function to build the classifier used by the parser
+def load_classifier(path=None):
+    """Load rules from `path`, else from the file named by SCRAPER_CLASSIFIER_RULES, else the defaults."""
+    path = path or os.environ.get(RULES_ENV_VAR)
+    if path:
+        return Classifier.from_file(path)
+    return Classifier()
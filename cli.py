@@ -0,0 +1,149 @@
+import argparse
+import sys
+import time
+from importlib.util import find_spec
+
+from jobs import CANCELLED, FINISHED, Job, format_seconds
+from sites import SITES
+
+# Export formats accepted on the command line -> EXPORT_FORMATS label ("none" only downloads)
+FORMATS = {"xlsx": "Excel (.xlsx)", "csv": "CSV (.csv)", "none": None}
+
+# Parser backends whose libraries are installed (as parser_backends.available_backends),
+# looked up without importing them so --help and argument errors stay fast
+BACKENDS = ["html.parser"] + [name for name in ("lxml", "selectolax") if find_spec(name) is not None]
+
+# How often progress is printed during a stage (seconds)
+PROGRESS_INTERVAL = 10
+
+# Exit codes besides 0 (success) and 2 (bad arguments, from argparse)
+EXIT_FAILED = 1
+EXIT_FETCH_ERRORS = 3  # Only with --strict
+EXIT_INTERRUPTED = 130
+
+
+class ConsoleJob(Job):
+    """A Job that reports to stderr: stages, warnings, errors and progress every few seconds."""
+
+    def __init__(self, title, verbose=False, interval=PROGRESS_INTERVAL):
+        super().__init__(1, title)
+        self.verbose = verbose
+        self.interval = interval
+        self._reported = 0.0
+
+    def set_stage(self, stage, total=None):
+        super().set_stage(stage, total)
+        print(f"{stage}..." if total is None else f"{stage} ({total})...", file=sys.stderr)
+
+    def advance(self, done=None, total=None):
+        super().advance(done, total)
+        now = time.monotonic()
+        if now - self._reported >= self.interval or self.done == self.total:
+            self._reported = now
+            eta = self.eta()
+            left = f", about {format_seconds(eta)} left" if eta is not None and self.done != self.total else ""
+            print(f"  {self.done}/{self.total or '?'}{left}", file=sys.stderr)
+
+    def log(self, level, message):
+        super().log(level, message)
+        if level != "info":
+            print(f"{level.upper()}: {message}", file=sys.stderr)
+        elif self.verbose:
+            print(message, file=sys.stderr)
+
+
+# Function to build the argument parser
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Scrape, download, parse and export articles without the Streamlit UI."
+    )
+    parser.add_argument("--site", default="Commercial Search", choices=list(SITES), help="site to scrape")
+    parser.add_argument("-c", "--category", action="append", default=[],
+                        help="category label or slug to crawl; repeat for several (default: all categories)")
+    parser.add_argument("-p", "--pages", type=int, default=1, help="listing pages per category")
+    parser.add_argument("-o", "--directory", required=True, help="directory for the HTML files and exports")
+    parser.add_argument("-f", "--format", default="xlsx", choices=list(FORMATS), help="export format")
+    parser.add_argument("--parquet", action="store_true", help="also write the partitioned Parquet dataset")
+    parser.add_argument("--per-host-limit", type=int, help="maximum simultaneous downloads per host")
+    parser.add_argument("--delay", type=float, help="pause after each download per connection (seconds)")
+    parser.add_argument("--max-rate", type=float, help="cap of each host's adaptive request rate (requests/s)")
+    parser.add_argument("--parse-workers", type=int, help="number of parse worker processes")
+    parser.add_argument("--backend", choices=BACKENDS, help="HTML parser backend (default: lxml when installed)")
+    parser.add_argument("--verify-backend", action="store_true", help="compare the backend with html.parser")
+    parser.add_argument("--no-http-cache", action="store_true", help="do not reuse unchanged pages")
+    parser.add_argument("--no-parse-cache", action="store_true", help="do not reuse earlier parse results")
+    parser.add_argument("--incremental", action="store_true", help="only fetch articles not collected before")
+    parser.add_argument("--pipelined", action="store_true", help="parse each article as it downloads")
+    parser.add_argument("--no-raw-html", action="store_true", help="do not save raw HTML in pipelined mode")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="start over instead of resuming an interrupted crawl with the same settings")
+    parser.add_argument("--strict", action="store_true",
+                        help=f"exit with status {EXIT_FETCH_ERRORS} when any page or article failed to download")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every saved article")
+    return parser
+
+
+# Function to turn category arguments into the site's category labels
+def resolve_categories(parser, site, names):
+    """Map labels or slugs to labels; no names means every category (or the single unnamed one)."""
+    if not site.categories:
+        if names:
+            parser.error(f"{site.name} has no categories")
+        return [""]
+    labels = {**{slug: label for label, slug in site.categories.items()}, **{label: label for label in site.categories}}
+    unknown = [name for name in names if name not in labels]
+    if unknown:
+        parser.error(f"unknown categories for {site.name}: {', '.join(unknown)} (choose from {', '.join(site.categories)})")
+    return [labels[name] for name in names] or list(site.categories)
+
+
+# Function to run a crawl from the command line
+def main(argv=None):
+    """Run one crawl and return the process exit status."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    site = SITES[args.site]
+    categories = resolve_categories(parser, site, args.category)
+    if FORMATS[args.format] and not site.article_selectors:
+        parser.error(f"{site.name} has no article selectors; use --format none to only download")
+
+    # The scraping stack (pandas, parsers, exporters) is only imported once the arguments are valid
+    from crawler import CrawlSettings, run_crawl
+
+    settings = CrawlSettings(
+        site, categories, args.pages, args.directory, export_format=FORMATS[args.format],
+        parquet_label=("All" if len(categories) > 1 else categories[0]) if args.parquet else None,
+        use_http_cache=not args.no_http_cache, use_parse_cache=not args.no_parse_cache,
+        incremental=args.incremental, pipelined=args.pipelined, save_raw_html=not args.no_raw_html,
+        verify_backend=args.verify_backend, resume=not args.no_resume,
+    )
+    overrides = {"per_host_limit": args.per_host_limit, "request_delay": args.delay, "max_rate": args.max_rate,
+                 "parse_workers": args.parse_workers, "parser_backend": args.backend}
+    settings = settings._replace(**{name: value for name, value in overrides.items() if value is not None})
+
+    job = ConsoleJob(f"{site.name}: {', '.join(filter(None, categories)) or 'all'}, {args.pages} pages", args.verbose)
+    try:
+        job.run(run_crawl, settings)
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.", file=sys.stderr)
+        return EXIT_INTERRUPTED
+
+    counts = "".join(f", {name} {value}" for name, value in sorted(job.counts.items()))
+    print(f"{job.status.capitalize()} in {format_seconds(job.finished - job.started)}{counts}", file=sys.stderr)
+    if job.status == CANCELLED:
+        return EXIT_INTERRUPTED
+    if job.status != FINISHED:
+        print(f"An error occurred: {job.error}", file=sys.stderr)
+        return EXIT_FAILED
+    if job.result:
+        print(job.result["export_file"])  # The only line on stdout, for scripts
+    if args.strict and job.counts["errors"]:
+        return EXIT_FETCH_ERRORS
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+#process to run (e.g. from cron):
+# python cli.py --category Office --category Retail --pages 3 --directory ./html_files --format csv
@@ -0,0 +1,205 @@
+import glob
+import json
+import os
+import time
+from collections import namedtuple
+
+from dedup import canonicalize_url
+
+# Name of the file (inside the save directory) that remembers collected articles
+STATE_FILE_NAME = ".crawl_state.json"
+
+# Name of the write-ahead journal of the latest crawl (inside the save directory)
+JOURNAL_FILE_NAME = ".crawl_journal.jsonl"
+
+# Journal entries written between two fsyncs; losing power loses at most these
+JOURNAL_SYNC_EVERY = 20
+
+# Age (seconds since the run started) after which an interrupted crawl is no longer resumed
+JOURNAL_MAX_AGE = 24 * 60 * 60
+
+# What an interrupted crawl had done, read back from its journal:
+#   frontier     - [(link, [categories])] in discovery order, or None when listing never finished
+#   stored       - [(link, file name, new)] of articles saved to disk; `new` is False when the
+#                  content was already stored under that file name
+#   exported     - [(link, file name, record)] of rows written to the export (pipelined mode)
+#   export_files - glob patterns of the interrupted run's partial export files, which must not be kept
+#                  (Parquet parts)
+ResumeState = namedtuple("ResumeState", ["frontier", "stored", "exported", "export_files"])
+
+
+class SeenArticles:
+    """Per-category record of article URLs that have already been collected."""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, STATE_FILE_NAME)
+        self._seen = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                self._seen = {category: set(urls) for category, urls in json.load(file).items()}
+        except (OSError, ValueError):
+            pass  # First run (or unreadable state): nothing is known yet
+
+    def known(self, category):
+        """Return the set of article URLs already collected for `category`."""
+        return self._seen.setdefault(category, set())
+
+    def mark(self, category, urls):
+        """Remember that `urls` have been collected for `category`."""
+        self.known(category).update(urls)
+
+    def save(self):
+        """Write the state back to disk atomically."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({category: sorted(urls) for category, urls in self._seen.items()}, file, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+class Frontier:
+    """Articles to fetch in one run, each listed once with every category it appeared in."""
+
+    def __init__(self):
+        self._entries = {}  # canonical URL -> (first link seen, [categories])
+
+    def add(self, category, links):
+        """Add the links found on `category`'s listing pages."""
+        for link in links:
+            _, categories = self._entries.setdefault(canonicalize_url(link), (link, []))
+            if category not in categories:
+                categories.append(category)
+
+    def links(self):
+        """Return every article link once, in discovery order."""
+        return [link for link, _ in self._entries.values()]
+
+    @property
+    def categories(self):
+        """Return the link -> categories mapping, as accepted by ArticleIndex."""
+        return {link: categories for link, categories in self._entries.values()}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CrawlJournal:
+    """Append-only JSON-lines journal of one crawl, so an interrupted crawl resumes where it stopped.
+
+    A run writes its settings key first, then the discovered frontier, one
+    entry per stored article and per exported row, and "finished" at the
+    end. Every entry is flushed as it is written and fsynced at least every
+    JOURNAL_SYNC_EVERY entries and at every stage boundary. A later run with
+    the same key finds no "finished" entry and picks up the work (see
+    `interrupted`), unless the run started more than JOURNAL_MAX_AGE ago; any
+    other run starts a new journal, removing the partial export files the
+    old one left behind.
+    """
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, JOURNAL_FILE_NAME)
+        self._file = None
+        self._unsynced = 0
+
+    def _entries(self):
+        entries = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break  # A line cut short by the crash; everything before it is intact
+        except OSError:
+            pass
+        return entries
+
+    def interrupted(self, key, max_age=JOURNAL_MAX_AGE):
+        """Return the ResumeState of an unfinished run with the same `key` started within `max_age` seconds, or None."""
+        entries = self._entries()
+        if not entries or entries[0].get("event") != "start" or entries[0].get("key") != key:
+            return None
+        if time.time() - entries[0].get("started", 0) > max_age:
+            return None
+        frontier, stored, exported, export_files = None, [], [], []
+        for entry in entries[1:]:
+            event = entry.get("event")
+            if event == "finished":
+                return None
+            if event == "discovered":
+                frontier = [(link, categories) for link, categories in entry["links"]]
+            elif event == "stored":
+                stored.append((entry["link"], entry["file"], entry.get("new", True)))
+            elif event == "exported":
+                exported.append((entry["link"], entry["file"], entry["record"]))
+            elif event == "export_file":
+                export_files.append(entry["path"])
+        return ResumeState(frontier, stored, exported, export_files)
+
+    def start(self, key, resume=None):
+        """Open the journal: append to the interrupted run being resumed, or start a new one for `key`."""
+        if resume is None:
+            # Partial export files of a run that is not resumed would otherwise stay behind for good
+            for entry in self._entries():
+                if entry.get("event") == "export_file":
+                    for path in glob.glob(entry["path"]):
+                        os.remove(path)
+        self._file = open(self.path, 'a' if resume is not None else 'w', encoding='utf-8')
+        if resume is None:
+            self._write({"event": "start", "key": key, "started": time.time()}, sync=True)
+
+    def discovered(self, frontier):
+        """Record every article of the run with its categories (a crawl_state.Frontier)."""
+        self._write({"event": "discovered", "links": list(frontier.categories.items())}, sync=True)
+
+    def stored(self, link, file_name, new=True):
+        """Record an article saved to disk (and registered in the article index) as `file_name`."""
+        self._write({"event": "stored", "link": link, "file": file_name, "new": new})
+
+    def exported(self, link, file_name, record):
+        """Record a row written to the export, with the row itself so a resumed run can write it again."""
+        self._write({"event": "exported", "link": link, "file": file_name, "record": record})
+
+    def export_file(self, path):
+        """Record the files (a glob pattern) the run exports to that are only valid once the run finishes."""
+        self._write({"event": "export_file", "path": path}, sync=True)
+
+    def finish(self):
+        """Mark the run complete, so the next run starts afresh."""
+        self._write({"event": "finished"}, sync=True)
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self._sync()
+            self._file.close()
+
+    def _write(self, entry, sync=False):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()  # Survives the process being killed; fsync below covers the machine going down
+        self._unsynced += 1
+        if sync or self._unsynced >= JOURNAL_SYNC_EVERY:
+            self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+
+# Function to walk listing pages until only known articles remain
+def iter_new_links(page_urls, scrape_fn, known):
+    """Scrape listing pages in order and yield `(page_url, new_links)` for each one.
+
+    Links in `known` (or already yielded) are skipped. Paging stops after the
+    first page whose links are all known, since listings are newest-first and
+    everything behind it has been collected on an earlier run.
+    """
+    yielded = set()
+    for page_url in page_urls:
+        links = scrape_fn(page_url)
+        new_links = []
+        for link in links:
+            if link not in known and link not in yielded:
+                yielded.add(link)
+                new_links.append(link)
+        yield page_url, new_links
+        if links and not new_links:
+            return
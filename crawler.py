@@ -0,0 +1,364 @@
+import glob
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from article_parser import iter_parsed_records, compare_backends, COLUMN_ORDER, PARSE_CACHE_VERSION, PARSE_WORKERS
+from crawl_state import CrawlJournal, Frontier, SeenArticles
+from dedup import ArticleIndex, canonicalize_url
+from downloader import MAX_RATE, MAX_WORKERS, PER_HOST_LIMIT, REQUEST_DELAY
+from exporters import open_exporter, CATEGORY_FIELD, EXPORT_FORMATS, MultiExporter, ParquetExporter
+from http_cache import HttpCache
+from metrics import RunMetrics
+from parse_cache import ParseCache
+from parser_backends import DEFAULT_BACKEND
+from pipeline import stream_articles
+from site_engine import SiteEngine
+
+# Number of articles the backend check compares against html.parser
+VERIFY_SAMPLE = 20
+
+
+# Function to clean filenames
+def clean_filename(url, unique_suffix):
+    """Create a valid filename from a URL and add a unique suffix."""
+    slug = re.sub(r'[^\w\-]', '_', url.split('/')[-1])  # Clean the slug
+    return f"{slug}_{unique_suffix}.html"  # Unique filename with suffix
+
+
+# Everything one crawl needs; front ends fill it from their widgets:
+#   export_format  - a key of EXPORT_FORMATS, or None to only download the articles
+#   parquet_label  - Parquet partition of rows without a category (None skips the Parquet export)
+#   max_rate       - cap (requests per second) of each host's adaptive request rate
+#   resume         - pick up an interrupted crawl of the same site, categories and pages from its journal
+CrawlSettings = namedtuple("CrawlSettings", [
+    "site", "categories", "pages", "directory", "filename_fn", "per_host_limit", "request_delay",
+    "use_http_cache", "incremental", "export_format", "export_columns", "parquet_label",
+    "parse_workers", "parser_backend", "verify_backend", "use_parse_cache", "pipelined", "save_raw_html",
+    "max_rate", "resume",
+], defaults=[
+    clean_filename, PER_HOST_LIMIT, REQUEST_DELAY, True, False, None, COLUMN_ORDER, None,
+    PARSE_WORKERS, DEFAULT_BACKEND, False, True, False, True, MAX_RATE, True,
+])
+
+
+# Seconds between cancellation checks while waiting for another crawl of the same directory
+LOCK_POLL_INTERVAL = 0.5
+
+# One lock per save directory: crawls of the same directory would hand out the same file
+# suffixes and rewrite each other's index, state, journal and export files
+_directory_locks = {}
+_directory_locks_guard = threading.Lock()
+
+
+# Function to get the lock of a save directory
+def directory_lock(directory):
+    """Return the lock every crawl of `directory` in this process holds while it runs."""
+    key = os.path.normcase(os.path.realpath(directory))
+    with _directory_locks_guard:
+        return _directory_locks.setdefault(key, threading.Lock())
+
+
+# Function to describe what a crawl journal belongs to
+def journal_key(settings):
+    """The settings a resumed crawl must share with the interrupted one (the rest may change between runs)."""
+    return {
+        "site": settings.site.name, "listing_url": settings.site.listing_url, "categories": list(settings.categories),
+        "pages": settings.pages, "incremental": settings.incremental, "export_format": settings.export_format,
+        "parquet_label": settings.parquet_label, "pipelined": settings.pipelined,
+        "save_raw_html": settings.save_raw_html,
+    }
+
+
+# Function to run one crawl from listing pages to export file
+def run_crawl(job, settings, list_fn=None):
+    """Scrape, download, parse and export one crawl, reporting through `job` (see jobs.Job).
+
+    Runs without any UI, so it can be handed to a JobTable or called
+    directly. `list_fn(engine, categories, pages)` replaces the listing step
+    outside incremental mode (e.g. with a cached one). Per-stage metrics are
+    kept on `job.metrics` and saved as metrics-<time>.json in the directory,
+    even when the crawl fails. Progress is journaled (see
+    crawl_state.CrawlJournal): a crawl that is cancelled, fails or is killed
+    resumes on the next run with the same settings within JOURNAL_MAX_AGE,
+    without listing again or refetching stored articles; `resume=False` starts over
+    instead, e.g. after an error that keeps coming back. Returns a dict
+    describing the export (or None when `export_format` is None). Crawls of the same directory run
+    one after the other (see `directory_lock`); a later one waits, and can
+    be cancelled while it waits.
+    """
+    os.makedirs(settings.directory, exist_ok=True)
+    lock = directory_lock(settings.directory)
+    if not lock.acquire(blocking=False):
+        job.set_stage("Waiting for another crawl of this directory")
+        job.log("info", f"Another crawl is using {settings.directory}; waiting for it to finish.")
+        while not lock.acquire(timeout=LOCK_POLL_INTERVAL):
+            job.check()
+    try:
+        return _locked_crawl(job, settings, list_fn)
+    finally:
+        lock.release()
+
+
+# Function to run one crawl while holding its directory's lock
+def _locked_crawl(job, settings, list_fn):
+    job.metrics = RunMetrics()
+    metrics_file = os.path.join(settings.directory, f"metrics-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    journal = CrawlJournal(settings.directory)
+    key = journal_key(settings)
+    resume = journal.interrupted(key) if settings.resume else None
+    journal.start(key, resume)
+    try:
+        result = _crawl(job, settings, list_fn, job.metrics, journal, resume)
+        journal.finish()
+    finally:
+        journal.close()
+        job.metrics.save(metrics_file)
+    if result is not None:
+        result["metrics_file"] = metrics_file
+    return result
+
+
+# Function to run the steps of one crawl
+def _crawl(job, settings, list_fn, metrics, journal, resume):
+    directory = settings.directory
+    original_urls = {}
+
+    # Listing pages and articles share one engine: same host limits, delay and cache
+    cache = HttpCache(directory) if settings.use_http_cache else None
+    engine = SiteEngine(settings.site, max(MAX_WORKERS, settings.per_host_limit), settings.per_host_limit,
+                        settings.request_delay, cache, metrics=metrics, max_rate=settings.max_rate,
+                        stop=_stop_event(job))
+    categories = list(settings.categories)
+    selectors = settings.site.article_selectors
+    selectors = (selectors["title"], selectors["date"], selectors["tags"], selectors["companies"]) if selectors else None
+
+    # Scrape links from the listing pages of every category side by side; in incremental
+    # mode each category stops paging at the first page that only lists known articles
+    seen = SeenArticles(directory)
+    job.set_stage("Listing pages")
+    if resume is not None and resume.frontier is not None:
+        # The interrupted run already listed everything; its frontier was journaled
+        frontier, errors = Frontier(), []
+        for link, link_categories in resume.frontier:
+            for category in link_categories:
+                frontier.add(category, [link])
+    elif settings.incremental:
+        known = {category: seen.known(category) for category in categories}
+        frontier, errors = engine.crawl_categories(categories, settings.pages, known)
+    elif list_fn is not None:
+        frontier, errors = list_fn(engine, categories, settings.pages)
+    else:
+        frontier, errors = engine.crawl_categories(categories, settings.pages)
+    for error in errors:
+        job.log("error", error)
+        job.count("errors")
+    if resume is None or resume.frontier is None:
+        journal.discovered(frontier)
+    tags = frontier.categories  # Every category each article was listed in
+    job.count("found", len(frontier))
+    job.log("info", f"Found {len(frontier)} articles across {len(categories)} categories.")
+
+    # Skip articles already stored by an earlier run or another category
+    index = ArticleIndex(directory)
+    done = _replay(job, resume, index, seen, tags) if resume is not None else set()
+    run_files = {file_name for _, file_name, new in resume.stored if new} if resume is not None else set()
+    links = [link for link in index.new_links(frontier.links(), tags) if canonicalize_url(link) not in done]
+    job.check()
+
+    if settings.export_format is None:
+        _download(job, engine, links, directory, settings.filename_fn, original_urls, index, seen, tags, journal,
+                  run_files)
+        _log_rates(job, engine)
+        return None
+
+    # Rows are written to the export file as soon as they are produced
+    export_file_name, export_mime = EXPORT_FORMATS[settings.export_format]
+    export_file = os.path.join(directory, export_file_name)
+    export_targets = [open_exporter(export_file, settings.export_columns)]
+    parquet = None
+    if settings.parquet_label:
+        # Parts left half-written by a killed run are replaced by this one's, which hold the same rows
+        for pattern in resume.export_files if resume is not None else ():
+            for path in glob.glob(pattern):
+                os.remove(path)
+        parquet = ParquetExporter(os.path.join(directory, "parquet"), settings.export_columns, settings.parquet_label)
+        export_targets.append(parquet)
+        journal.export_file(parquet.temp_pattern)
+    with MultiExporter(export_targets) as exporter:
+        if settings.pipelined:
+            # Rows the interrupted run exported are written again from the journal, without refetching
+            for _, _, record in resume.exported if resume is not None else ():
+                exporter.write(record)
+            _stream(job, settings, engine, cache, links, selectors, original_urls, index, seen, tags, exporter, journal)
+        else:
+            _download(job, engine, links, directory, settings.filename_fn, original_urls, index, seen, tags, journal,
+                      run_files)
+
+            # Parse HTML files and stream the records to the export file
+            # Files saved on earlier runs keep their original URL through the article index
+            original_urls = {**index.original_urls(), **original_urls}
+            # A resumed run reads what the interrupted one parsed back from the parse cache
+            job.set_stage("Parsing articles")
+            for record in iter_parsed_records(
+                directory, *selectors, original_urls, index.duplicates, workers=settings.parse_workers,
+                backend=settings.parser_backend, use_cache=settings.use_parse_cache or resume is not None,
+                progress_callback=lambda done, total: job.advance(done, total), metrics=metrics
+            ):
+                entry = index.articles.get(record.get("File Name"))
+                record[CATEGORY_FIELD] = _category_value(entry["categories"] if entry else ())
+                with metrics.timer("export"):
+                    export_targets[0].write(record)
+                    # The file export holds the whole directory; the Parquet dataset only gets
+                    # the articles this run stored, so reruns do not add the same rows again
+                    if parquet is not None and record.get("File Name") in run_files:
+                        parquet.write(record)
+                job.count("parsed")
+                job.check()
+
+    # Optionally confirm the faster backend extracts the same fields as html.parser
+    mismatches = None
+    if settings.verify_backend and settings.parser_backend != "html.parser":
+        sample = [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                  if name.endswith('.html') and name not in index.duplicates][:VERIFY_SAMPLE]
+        mismatches = compare_backends(sample, *selectors, settings.parser_backend)
+        if mismatches:
+            job.log("warning", f"{settings.parser_backend} differs from html.parser on {len(mismatches)} fields.")
+        else:
+            job.log("info", f"{settings.parser_backend} matches html.parser on {len(sample)} sampled articles.")
+
+    _log_rates(job, engine)
+    if parquet is not None and parquet.rows:
+        job.log("info", f"Parquet dataset updated: {len(parquet.paths)} partitions under {parquet.root}")
+
+    return {
+        "export_file": export_file, "file_name": export_file_name, "mime": export_mime,
+        "label": f"Download {settings.export_format.split(' ')[0]} File", "mismatches": mismatches,
+    }
+
+
+# Function to join an article's categories into its exported "Category" value
+def _category_value(categories):
+    return ", ".join(category for category in categories if category) or None
+
+
+# Function to make a stop event for one stage of a crawl
+def _stop_event(job):
+    """Return an Event that is set as soon as `job` is cancelled, so waiting requests give up at once."""
+    stop = threading.Event()
+    job.on_cancel(stop.set)
+    return stop
+
+
+# Function to report where the adaptive request rates ended up
+def _log_rates(job, engine):
+    for host, rate in engine.limiter.rates().items():
+        job.log("info", f"Request rate for {host} settled at {rate:.1f}/s.")
+
+
+# Function to take over what an interrupted run had done
+def _replay(job, resume, index, seen, tags):
+    """Restore the index and seen state from the journal; return the canonical URLs that need no fetch."""
+    done = set()
+    restored = [(link, file_name) for link, file_name, _ in resume.stored if index.restore(link, file_name, tags)]
+    for link, file_name, _ in resume.exported:
+        if file_name is not None:
+            index.restore(link, file_name, tags)
+        restored.append((link, file_name))
+    for link, _ in restored:
+        done.add(canonicalize_url(link))
+        for category in tags.get(link, ()):
+            seen.mark(category, [link])
+    job.count("resumed", len(done))
+    job.log("info", f"Resuming an interrupted crawl: {len(done)} articles were already done.")
+    return done
+
+
+# Function to download the new articles of a crawl
+def _download(job, engine, links, directory, filename_fn, original_urls, index, seen, tags, journal, run_files):
+    """Download and save `links` concurrently, keeping one stored copy per article.
+
+    The names of newly stored files are added to `run_files`.
+    """
+    job.set_stage("Downloading articles", len(links))
+    try:
+        for link, file_name, error in engine.download(
+            links, directory, filename_fn, original_urls, start_suffix=index.next_suffix(), stop=_stop_event(job)
+        ):
+            job.advance()
+            if error:
+                job.log("error", error)
+                job.count("errors")
+            else:
+                # Keep one stored copy per article, even if the same content arrived under another URL
+                kept = index.add(link, os.path.join(directory, file_name), tags)
+                journal.stored(link, kept, new=kept == file_name)
+                if kept != file_name:
+                    original_urls.pop(file_name, None)
+                    job.log("info", f"Duplicate of {kept}: {link}")
+                    job.count("duplicates")
+                else:
+                    run_files.add(file_name)
+                    job.log("info", f"Saved: {os.path.join(directory, file_name)}")
+                    job.count("saved")
+                for category in tags[link]:
+                    seen.mark(category, [link])
+            job.check()
+    finally:
+        # Articles stored before a cancellation or failure stay known to later runs
+        seen.save()
+        index.save()
+
+
+# Function to download and parse the new articles of a crawl in one pass
+def _stream(job, settings, engine, cache, links, selectors, original_urls, index, seen, tags, exporter, journal):
+    """Parse each article in memory as soon as it arrives; raw HTML is written in the background."""
+    directory = settings.directory
+    save_raw_html = settings.save_raw_html
+    parse_cache = (ParseCache(directory, PARSE_CACHE_VERSION, selectors, settings.parser_backend)
+                   if settings.use_parse_cache else None)
+    stored_before = set(index.articles)
+    exported = set()
+    job.set_stage("Downloading and parsing articles", len(links))
+    results = stream_articles(
+            links, selectors, directory if save_raw_html else None, settings.filename_fn,
+            start_suffix=index.next_suffix(), original_urls=original_urls,
+            max_workers=engine.max_workers, delay=settings.request_delay, cache=cache,
+            backend=settings.parser_backend, parse_workers=settings.parse_workers,
+            index=index if save_raw_html else None, category=tags, parse_cache=parse_cache,
+            limiter=engine.limiter, metrics=engine.metrics, stop=_stop_event(job)
+    )
+    completed = False
+    try:
+        for result in results:
+            if result.link is not None:
+                job.advance()
+            if result.error:
+                job.log("error", result.error)
+                job.count("errors")
+            elif result.duplicate_of:
+                job.log("info", f"Duplicate of {result.duplicate_of}: {result.link}")
+                job.count("duplicates")
+            else:
+                result.record[CATEGORY_FIELD] = _category_value(tags[result.link])
+                with engine.metrics.timer("export"):
+                    exporter.write(result.record)
+                journal.exported(result.link, result.file_name if save_raw_html else None, result.record)
+                exported.add(result.file_name)
+                job.count("parsed")
+                for category in tags[result.link]:
+                    seen.mark(category, [result.link])
+            job.check()
+        completed = True
+    finally:
+        results.close()  # Waits for the raw HTML writes still queued
+        if parse_cache is not None:
+            parse_cache.close()
+        if not completed:
+            # Articles stored but not exported yet are fetched again when the crawl resumes
+            for file_name in set(index.articles) - stored_before - exported:
+                index.forget(file_name)
+        seen.save()
+        index.save()
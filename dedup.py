@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Name of the file (inside the save directory) that indexes stored articles
+INDEX_FILE_NAME = ".article_index.json"
+
+# Query parameters that only track the visitor and never change the article
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref"}
+
+
+# Function to canonicalize article URLs
+def canonicalize_url(url):
+    """Normalize an article URL so the same article always maps to the same key."""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+# Function to hash article content held in memory
+def hash_text(text):
+    """Return the SHA-256 digest of article HTML as it is written to disk (UTF-8)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+# Function to hash a stored article
+def hash_file(file_path):
+    """Return the SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArticleIndex:
+    """Cross-run, cross-category index that keeps one stored copy per article."""
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        self.path = os.path.join(self.directory, INDEX_FILE_NAME)
+        self.articles = {}  # file name -> {"url", "link", "hash", "categories"}
+        self.duplicates = {}  # duplicate file name -> file name of the copy that is kept
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+            self.articles = state.get("articles", {})
+            self.duplicates = state.get("duplicates", {})
+        except (OSError, ValueError):
+            self._adopt_existing_files()
+        self._by_url = {info["url"]: name for name, info in self.articles.items() if info.get("url")}
+        self._by_hash = {info["hash"]: name for name, info in self.articles.items()}
+
+    def _adopt_existing_files(self):
+        """Index HTML files saved before deduplication existed, flagging identical copies."""
+        by_hash = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith('.html'):
+                continue
+            content_hash = hash_file(os.path.join(self.directory, filename))
+            if content_hash in by_hash:
+                self.duplicates[filename] = by_hash[content_hash]
+            else:
+                by_hash[content_hash] = filename
+                self.articles[filename] = {"url": None, "link": None, "hash": content_hash, "categories": []}
+
+    def _tag(self, file_name, category, link=None):
+        """Tag a stored article with `category`: one name, a list of names, or a dict of link -> names."""
+        if isinstance(category, dict):
+            category = category.get(link, ())
+        categories = self.articles[file_name]["categories"]
+        for name in ([category] if isinstance(category, str) else category or ()):
+            if name and name not in categories:
+                categories.append(name)
+
+    def new_links(self, links, category=None):
+        """Drop links whose article is already stored (tagging it with `category`) and repeats within `links`.
+
+        `category` may also be a list of categories, or a dict mapping each
+        link to its categories (see crawl_state.Frontier.categories).
+        """
+        fresh = []
+        pending = set()
+        for link in links:
+            key = canonicalize_url(link)
+            if key in self._by_url:
+                self._tag(self._by_url[key], category, link)
+            elif key not in pending:
+                pending.add(key)
+                fresh.append(link)
+        return fresh
+
+    def add(self, link, file_path, category=None):
+        """Register a freshly saved article and return the file name that holds it.
+
+        If the same content is already stored under another name, the new file
+        is deleted and the existing file name is returned instead.
+        """
+        file_name = os.path.basename(file_path)
+        kept = self.register(link, file_name, hash_file(file_path), category)
+        if kept != file_name:
+            os.remove(file_path)
+        return kept
+
+    def register(self, link, file_name, content_hash, category=None):
+        """Record an article by content hash before (or without) reading it back from disk.
+
+        Returns `file_name`, or the name of the stored copy if the content is a duplicate.
+        """
+        key = canonicalize_url(link)
+        existing = self._by_hash.get(content_hash)
+        if existing is not None and existing != file_name:
+            self._by_url.setdefault(key, existing)
+            if not self.articles[existing].get("url"):
+                self.articles[existing].update(url=key, link=link)
+            self._tag(existing, category, link)
+            return existing
+        self.articles[file_name] = {"url": key, "link": link, "hash": content_hash, "categories": []}
+        self._by_url[key] = file_name
+        self._by_hash[content_hash] = file_name
+        self._tag(file_name, category, link)
+        return file_name
+
+    def restore(self, link, file_name, category=None):
+        """Register an article an interrupted run had stored (see crawl_state.CrawlJournal).
+
+        Returns False when its file is gone, so the article must be fetched again.
+        """
+        key = canonicalize_url(link)
+        if key in self._by_url:
+            self._tag(self._by_url[key], category, link)
+            return True
+        if file_name in self.articles:  # Adopted without its link, or stored under another link first
+            self._by_url[key] = file_name
+            if not self.articles[file_name].get("url"):
+                self.articles[file_name].update(url=key, link=link)
+            self._tag(file_name, category, link)
+            return True
+        file_path = os.path.join(self.directory, file_name)
+        if not os.path.exists(file_path):
+            return False
+        self.add(link, file_path, category)  # Deletes the file if its content is stored under another name
+        return True
+
+    def forget(self, file_name):
+        """Drop an article stored by a run that stopped before using it, deleting its file."""
+        info = self.articles.pop(file_name, None)
+        if info is None:
+            return
+        for key in [key for key, name in self._by_url.items() if name == file_name]:
+            del self._by_url[key]
+        if self._by_hash.get(info["hash"]) == file_name:
+            del self._by_hash[info["hash"]]
+        file_path = os.path.join(self.directory, file_name)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def original_urls(self):
+        """Return the filename -> article URL mapping for every indexed article."""
+        return {name: info["link"] for name, info in self.articles.items() if info.get("link")}
+
+    def next_suffix(self):
+        """Return a filename suffix past every one used so far, so a new run never overwrites an older file."""
+        suffixes = [int(match.group(1)) for match in
+                    (re.search(r'_(\d+)\.html$', name) for name in os.listdir(self.directory)) if match]
+        return max(suffixes, default=0) + 1
+
+    def save(self):
+        """Write the index back to disk atomically."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({"articles": self.articles, "duplicates": self.duplicates}, file, indent=1)
+        os.replace(tmp_path, self.path)
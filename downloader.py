@@ -0,0 +1,300 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+import http_client
+
+# Default concurrency settings (operators can override these from the UI)
+MAX_WORKERS = 8  # Total number of download threads
+PER_HOST_LIMIT = 4  # Maximum simultaneous requests to a single host
+REQUEST_DELAY = 0.0  # Extra pause (seconds) a connection slot holds after each request; the rate limiter paces requests
+
+# Adaptive request rate per host (requests per second): it grows while the server answers
+# quickly, eases off when responses slow down and halves on every 429/503
+INITIAL_RATE = 5.0
+MIN_RATE = 0.1
+MAX_RATE = 50.0
+SLOW_START_FACTOR = 1.1  # Rate multiplier after each fast response, until the host first pushes back
+RATE_INCREASE = 0.25  # Added to the rate after each fast response from then on
+BACKOFF_FACTOR = 0.5  # Rate multiplier after a 429/503
+SLOWDOWN_FACTOR = 0.95  # Rate multiplier after a response much slower than usual
+SLOWDOWN_LATENCY = 2.0  # "Much slower": the average latency exceeds this multiple of the baseline
+LATENCY_SMOOTHING = 0.2  # Weight of the newest response in the average latency
+BASELINE_DRIFT = 1.01  # Lets the baseline latency creep up, so a slower normal is accepted over time
+
+# Retries of throttled and failed requests
+MAX_RETRIES = 4
+RETRY_BACKOFF = 1.0  # Seconds before the first retry without Retry-After; doubles on each attempt
+MAX_RETRY_WAIT = 300  # Longest Retry-After honoured (seconds)
+MAX_RETRY_TIME = 300  # Longest time (seconds) one article is retried before it counts as failed
+THROTTLE_STATUSES = (429, 503)  # The server asks us to slow down
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+# Function to read a Retry-After header
+def parse_retry_after(value):
+    """Return the seconds to wait from a Retry-After header (seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_WAIT)
+
+
+# Function to pause unless the caller stops
+def _pause(seconds, stop=None):
+    """Sleep `seconds`; returns False early when the `stop` event is set."""
+    if stop is None:
+        time.sleep(seconds)
+        return True
+    return not stop.wait(seconds)
+
+
+class HostThrottle:
+    """Concurrency slots and an adaptive token bucket for one host.
+
+    Use as a context manager to hold a slot, call `wait_turn()` before each
+    request and `record()` after it. Each response adjusts the rate: fast
+    answers raise it (by 10% each until the host first pushes back, then
+    step by step), slow ones lower it a little, and 429/503 halve it and
+    pause the host for the Retry-After time.
+    """
+
+    def __init__(self, limit, rate=INITIAL_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.capacity = float(limit)  # Up to one burst of requests across all slots
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._latency = None
+        self._baseline = None
+        self._slow_start = True
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._semaphore.release()
+
+    def _reserve(self):
+        """Take a token (possibly ahead of time) and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate, self._paused_until - now)
+
+    def wait_turn(self, stop=None):
+        """Block until the bucket allows the next request; False when `stop` was set meanwhile."""
+        wait = self._reserve()
+        return _pause(wait, stop) if wait else not (stop is not None and stop.is_set())
+
+    def record(self, status, latency=None, retry_after=None):
+        """Adapt the rate to one response's status code, latency (seconds) and Retry-After (seconds)."""
+        with self._lock:
+            if status in THROTTLE_STATUSES:
+                self._slow_start = False
+                self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+                pause = retry_after if retry_after is not None else 1 / self.rate
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                self._tokens = min(self._tokens, 0.0)  # No burst right after the pause
+            elif status < 500 and latency is not None:
+                if self._latency is None:
+                    self._latency = latency
+                else:
+                    self._latency = LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self._latency
+                self._baseline = self._latency if self._baseline is None else min(self._latency, self._baseline * BASELINE_DRIFT)
+                if self._latency > SLOWDOWN_LATENCY * self._baseline:
+                    self._slow_start = False
+                    self.rate = max(self.min_rate, self.rate * SLOWDOWN_FACTOR)
+                elif self._slow_start:
+                    self.rate = min(self.max_rate, self.rate * SLOW_START_FACTOR)
+                else:
+                    self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+
+
+class HostLimiter:
+    """Hand out one HostThrottle per host so no site gets more than `limit` requests at once,
+    at a request rate that adapts to how the site responds."""
+
+    def __init__(self, limit, rate=INITIAL_RATE, max_rate=MAX_RATE):
+        self.limit = max(1, int(limit))
+        self.rate = rate
+        self.max_rate = max_rate
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def for_url(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostThrottle(self.limit, self.rate, max_rate=self.max_rate)
+            return self._hosts[host]
+
+    def rates(self):
+        """Current request rate (per second) of every host seen so far."""
+        with self._lock:
+            return {host: throttle.rate for host, throttle in self._hosts.items()}
+
+
+# Function to download one article
+def fetch_article(link, limiter, headers=None, delay=REQUEST_DELAY, cache=None, stop=None, metrics=None,
+                  stage="download", retries=MAX_RETRIES, max_retry_time=MAX_RETRY_TIME):
+    """Download a single link while holding its host slot.
+
+    Returns `(text, None)` on success or `(None, error message)` on failure.
+    Requests are paced by the host's adaptive rate. 429/5xx responses and
+    connection errors are retried up to `retries` times, after the
+    Retry-After time or an exponential backoff; the slot is released while
+    waiting. No retry is made whose wait would end more than
+    `max_retry_time` seconds after the first attempt. When the `stop` event
+    is set, waits end early and nothing more is fetched. With a `RunMetrics`
+    as `metrics`, the wait for the slot and rate, the request time, bytes,
+    status codes and retries are recorded under `stage`.
+    """
+    host = limiter.for_url(link)
+    first_attempt = time.monotonic()
+    for attempt in range(retries + 1):
+        if attempt and metrics is not None:
+            metrics.count("retries")
+        response, error = None, None
+        waited = time.perf_counter()
+        with host:
+            if not host.wait_turn(stop):
+                return None, f"Skipped article: {link}, download stopped"
+            if metrics is not None:
+                metrics.observe(f"{stage} wait", time.perf_counter() - waited)
+            started = time.perf_counter()
+            try:
+                response = http_client.get(link, headers=headers, cache=cache)
+            except requests.RequestException as e:
+                error = f"Failed to fetch article: {link}, error: {e}"
+                if metrics is not None:
+                    metrics.count("request errors")
+            finally:
+                elapsed = time.perf_counter() - started
+                if delay:
+                    time.sleep(delay)  # Keep the slot busy briefly to stay polite to the server
+
+        retry_after = None
+        if response is not None:
+            from_cache = getattr(response, "from_cache", False)
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            host.record(response.status_code, elapsed, retry_after)
+            if metrics is not None:
+                metrics.observe(stage, elapsed, 0 if from_cache else len(response.content))
+                metrics.status(304 if from_cache else response.status_code)  # A cached copy means the server said 304
+            if response.status_code not in RETRY_STATUSES:
+                break
+            error = f"Failed to fetch article: {link}, status code: {response.status_code}"
+
+        if attempt == retries:
+            break
+        # Throttled responses already pause the whole host; other failures only back off this request
+        throttled = response is not None and response.status_code in THROTTLE_STATUSES
+        pause = retry_after if retry_after is not None else (0.0 if throttled else RETRY_BACKOFF * 2 ** attempt)
+        if time.monotonic() - first_attempt + pause > max_retry_time:
+            if metrics is not None:
+                metrics.count("retries given up")
+            break
+        if not throttled and not _pause(pause, stop):
+            return None, f"Skipped article: {link}, download stopped"
+
+    if response is None:
+        return None, error
+    if response.status_code != 200:
+        return None, f"Failed to fetch article: {link}, status code: {response.status_code}"
+    return response.text, None
+
+
+# Function to write downloaded HTML to disk
+def write_html(text, file_path, metrics=None):
+    """Save article HTML to `file_path`. Returns None on success or an error message."""
+    started = time.perf_counter()
+    try:
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(text)
+    except Exception as e:
+        return f"Error saving file {os.path.basename(file_path)}: {e}"
+    if metrics is not None:
+        metrics.observe("write", time.perf_counter() - started)
+    return None
+
+
+# Function to download one article and write it to disk
+def fetch_and_save(link, file_path, limiter, headers=None, delay=REQUEST_DELAY, cache=None, stop=None,
+                   metrics=None):
+    """Download a single link and save the body to `file_path`.
+
+    Returns None on success or an error message on failure.
+    """
+    text, error = fetch_article(link, limiter, headers, delay, cache, stop, metrics)
+    if error:
+        return error
+    return write_html(text, file_path, metrics)
+
+
+# Function to download many articles concurrently
+def download_articles(links, directory, filename_fn, original_urls=None, start_suffix=1,
+                      max_workers=MAX_WORKERS, per_host_limit=PER_HOST_LIMIT,
+                      delay=REQUEST_DELAY, headers=None, cache=None, limiter=None, metrics=None, stop=None):
+    """Download `links` with a bounded thread pool and a per-host concurrency limit.
+
+    Filenames are assigned up front as `filename_fn(link, suffix)` with suffixes
+    counting from `start_suffix` in link order, so the saved files are the same
+    as the sequential loop produced. Yields `(link, file_name, error)` in
+    completion order; `original_urls` is only updated from the calling thread.
+    Pass an `HttpCache` as `cache` to revalidate previously downloaded articles,
+    and a `HostLimiter` as `limiter` to share host slots with other downloads.
+    A `RunMetrics` as `metrics` records request and write timings. Setting
+    the `stop` event (e.g. when a job is cancelled) ends the downloads' waits
+    at once; it is also set when the caller stops iterating.
+    """
+    limiter = limiter or HostLimiter(per_host_limit)
+    http_client.ensure_pool_size(limiter.limit)  # One keep-alive connection per host slot
+    jobs = []
+    for offset, link in enumerate(links):
+        file_name = filename_fn(link, start_suffix + offset)
+        jobs.append((link, file_name, os.path.join(directory, file_name)))
+
+    if stop is None:
+        stop = threading.Event()  # Set when the caller stops early, so downloads waiting for a slot give up
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        futures = {
+            executor.submit(fetch_and_save, link, file_path, limiter, headers, delay, cache, stop, metrics): (link, file_name)
+            for link, file_name, file_path in jobs
+        }
+        try:
+            for future in as_completed(futures):
+                link, file_name = futures.pop(future)
+                error = future.result()
+                if error is None and original_urls is not None:
+                    original_urls[file_name] = link  # Store the original URL in the mapping
+                yield link, file_name, error
+        finally:
+            stop.set()
+            executor.shutdown(cancel_futures=True)
+            # Files finished after the caller stopped were never handed over; leave no untracked copies
+            for future, (link, file_name) in futures.items():
+                if not future.cancelled() and future.exception() is None and future.result() is None:
+                    file_path = os.path.join(directory, file_name)
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
@@ -0,0 +1,281 @@
+import csv
+import os
+import re
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+# xlsxwriter streams rows to disk in constant memory; openpyxl's write-only mode is the fallback
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# pyarrow is optional; without it the Parquet export is unavailable
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    pa = pq = None
+    HAS_PYARROW = False
+
+# Rows written between explicit flushes to disk
+FLUSH_EVERY = 50
+
+# Rows buffered before they are written as one Parquet row group
+ROW_GROUP_SIZE = 500
+
+# Record field listing an article's categories ("Office, Retail"); the first one is its Parquet partition
+CATEGORY_FIELD = "Category"
+
+# Formats tried, in order, when reading "Date Published"
+DATE_FORMATS = ("%B %d, %Y", "%b %d, %Y", "%Y-%m-%d", "%m/%d/%Y")
+
+# Export formats offered in the UI: label -> (file name, MIME type)
+EXPORT_FORMATS = {
+    "Excel (.xlsx)": ("parsed_articles.xlsx", "application/vnd.ms-excel"),
+    "CSV (.csv)": ("parsed_articles.csv", "text/csv"),
+}
+
+
+class CsvExporter:
+    """Append rows to a CSV file as they are produced, flushing every `flush_every` rows."""
+
+    def __init__(self, path, column_order, flush_every=FLUSH_EVERY):
+        self.path = path
+        self.column_order = list(column_order)
+        self.flush_every = flush_every
+        self.rows = 0
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.column_order)
+        self._file.flush()
+
+    def write(self, record):
+        self._writer.writerow(["" if record.get(column) is None else record.get(column) for column in self.column_order])
+        self.rows += 1
+        if self.rows % self.flush_every == 0:
+            self._file.flush()
+            os.fsync(self._file.fileno())  # Rows written so far survive a crash
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class XlsxExporter:
+    """Write rows to an Excel file without keeping the sheet in memory.
+
+    An .xlsx file is only readable once it is closed, so the exporter is
+    closed (and the partial workbook finalized) even when the run fails.
+    """
+
+    def __init__(self, path, column_order, flush_every=FLUSH_EVERY):
+        self.path = path
+        self.column_order = list(column_order)
+        self.rows = 0
+        if xlsxwriter is not None:
+            self._workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_urls": False})
+            self._sheet = self._workbook.add_worksheet()
+            self._sheet.write_row(0, 0, self.column_order)
+        else:
+            from openpyxl import Workbook
+            self._workbook = Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet()
+            self._sheet.append(self.column_order)
+        self._closed = False
+
+    def write(self, record):
+        values = [record.get(column) for column in self.column_order]
+        self.rows += 1
+        if xlsxwriter is not None:
+            self._sheet.write_row(self.rows, 0, values)  # None becomes an empty cell
+        else:
+            self._sheet.append(values)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if xlsxwriter is not None:
+            self._workbook.close()
+        else:
+            self._workbook.save(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Function to turn a square footage string into an integer
+def parse_square_feet(text):
+    """Return the square footage as an int, or None when `text` holds no number."""
+    digits = re.sub(r'[^\d]', '', str(text)) if text is not None else ''
+    return int(digits) if digits else None
+
+# Function to turn a publication date string into a datetime
+def parse_date(text):
+    """Return "Date Published" as a datetime, or None when no known format matches."""
+    text = (text or '').strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    return None
+
+
+# Arrow type and converter of each typed column; every other column is a string
+if HAS_PYARROW:
+    TYPED_COLUMNS = {
+        "Date Published": (pa.timestamp("s"), parse_date),
+        "Region": (pa.dictionary(pa.int32(), pa.string()), None),
+        "Asset Type": (pa.dictionary(pa.int32(), pa.string()), None),
+        "Transaction Amount (USD)": (pa.float64(), None),
+        "Square Footage": (pa.int64(), parse_square_feet),
+    }
+else:
+    TYPED_COLUMNS = {}
+
+
+# Function to build the Arrow schema for the exported columns
+def article_schema(column_order):
+    """Return the typed Arrow schema for `column_order`."""
+    if not HAS_PYARROW:
+        raise ImportError("The Parquet export needs `pip install pyarrow`.")
+    return pa.schema([(column, TYPED_COLUMNS.get(column, (pa.string(), None))[0]) for column in column_order])
+
+
+class ParquetExporter:
+    """Write rows to a Parquet dataset partitioned by category and crawl date.
+
+    Each row lands in `root/category=<category>/crawl_date=<YYYY-MM-DD>/part-*.parquet`,
+    where <category> is the first entry of the row's CATEGORY_FIELD (an
+    article listed in several categories goes to the first one), or
+    `category` for rows without one. The schema is typed (see
+    `TYPED_COLUMNS`), with one row group per `row_group_size` rows of a
+    partition. Each run writes its own part file, so repeated crawls on the
+    same day add to a partition instead of replacing it; callers should only
+    write the articles their run collected. Parts are written under a hidden
+    temporary name (which dataset readers skip, see `temp_pattern`) and
+    renamed on `close()`; leaving a `with` block on an exception, or calling
+    `discard()`, drops them instead. `pandas.read_parquet(root)` loads every
+    partition at once.
+    """
+
+    def __init__(self, root, column_order, category, crawl_date=None, row_group_size=ROW_GROUP_SIZE):
+        self.schema = article_schema(column_order)
+        self.column_order = list(column_order)
+        self.row_group_size = row_group_size
+        self.root = root
+        self.category = category  # Partition of rows without a category of their own
+        self.crawl_date = crawl_date or datetime.now().strftime("%Y-%m-%d")
+        self.part_name = f"part-{time.strftime('%H%M%S')}-{os.getpid()}.parquet"
+        self.temp_pattern = os.path.join(root, "category=*", f"crawl_date={self.crawl_date}", f".{self.part_name}.tmp")
+        self.rows = 0
+        self.paths = []  # Part files published by close()
+        self._buffers = {}  # partition directory -> rows waiting for the next row group
+        self._writers = {}  # partition directory -> ParquetWriter, opened with its first row group
+
+    def partition(self, record):
+        """Return the partition directory of `record`."""
+        category = (record.get(CATEGORY_FIELD) or "").split(", ")[0] or self.category
+        return os.path.join(self.root, f"category={quote(category, safe='')}", f"crawl_date={self.crawl_date}")
+
+    def write(self, record):
+        directory = self.partition(record)
+        buffer = self._buffers.setdefault(directory, [])
+        buffer.append(record)
+        self.rows += 1
+        if len(buffer) >= self.row_group_size:
+            self._flush(directory)
+
+    def _temp_path(self, directory):
+        return os.path.join(directory, f".{self.part_name}.tmp")
+
+    def _flush(self, directory):
+        buffer = self._buffers.pop(directory, None)
+        if not buffer:
+            return
+        columns = {}
+        for column in self.column_order:
+            converter = TYPED_COLUMNS.get(column, (None, None))[1]
+            values = [record.get(column) for record in buffer]
+            columns[column] = [converter(value) for value in values] if converter else values
+        table = pa.Table.from_pydict(columns, schema=self.schema)
+        if directory not in self._writers:
+            os.makedirs(directory, exist_ok=True)
+            self._writers[directory] = pq.ParquetWriter(self._temp_path(directory), self.schema)
+        self._writers[directory].write_table(table)
+
+    def close(self):
+        """Write the remaining rows and publish each partition's part file under its final name."""
+        for directory in list(self._buffers):
+            self._flush(directory)
+        for directory, writer in self._writers.items():
+            writer.close()
+            path = os.path.join(directory, self.part_name)
+            os.replace(self._temp_path(directory), path)
+            self.paths.append(path)
+        self._writers = {}
+
+    def discard(self):
+        """Drop the rows of a run that did not finish, leaving the dataset as it was."""
+        self._buffers = {}
+        for directory, writer in self._writers.items():
+            writer.close()
+            if os.path.exists(self._temp_path(directory)):
+                os.remove(self._temp_path(directory))
+        self._writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class MultiExporter:
+    """Send every row to several exporters at once (e.g. Excel plus Parquet)."""
+
+    def __init__(self, exporters):
+        self.exporters = list(exporters)
+
+    @property
+    def rows(self):
+        return self.exporters[0].rows if self.exporters else 0
+
+    def write(self, record):
+        for exporter in self.exporters:
+            exporter.write(record)
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for exporter in self.exporters:
+            exporter.__exit__(*exc_info)  # Each exporter decides what to keep of a failed run
+
+
+# Function to open an exporter for a file name
+def open_exporter(path, column_order, flush_every=FLUSH_EVERY):
+    """Return a streaming exporter for `path`, picked from its extension (.csv or .xlsx)."""
+    if str(path).lower().endswith('.csv'):
+        return CsvExporter(path, column_order, flush_every)
+    return XlsxExporter(path, column_order, flush_every)
@@ -0,0 +1,183 @@
+import re
+from functools import lru_cache
+from itertools import islice
+
+import soupsieve
+from bs4 import SoupStrainer
+
+from parser_backends import HAS_SELECTOLAX, SELECTOLAX_BACKEND, make_selectolax_tree, make_soup, node_text
+
+# Extraction modes a field spec can use:
+#   "text"       - stripped text of the first element matching the selector (or None)
+#   "texts"      - stripped text of every matching element
+#   "link_texts" - text of each <a> inside the first match, skipping "More" links
+#   "paragraphs" - text of matching elements that pass the paragraph filter, up to `limit`
+
+# A selector naming one kind of element: optional tag name plus optional single class
+_SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)?(?:\.([\w-]+))?$')
+
+# A selector that starts with a single class, followed by descendant/child steps or nothing
+_CLASS_ROOT = re.compile(r'^\.([\w-]+)(?:[\s>]|$)')
+
+
+# Function to build the field spec for an article page
+def article_field_spec(title_css, date_css, tags_css, companies_css, paragraph_css="p", paragraph_limit=2):
+    """Describe the article fields as `{field: (selector, mode[, limit])}`.
+
+    New sites can reuse the extractor by writing their own spec in the same shape.
+    """
+    return {
+        "title": (title_css, "text"),
+        "date": (date_css, "text"),
+        "tags": (tags_css, "link_texts"),
+        "companies": (companies_css, "texts"),
+        "paragraphs": (paragraph_css, "paragraphs", paragraph_limit),
+    }
+
+
+# Function to compile a field spec once
+@lru_cache(maxsize=64)
+def _compile_items(items):
+    compiled = []
+    for field, entry in items:
+        selector, mode = entry[0], entry[1]
+        limit = entry[2] if len(entry) > 2 else None
+        compiled.append((field, soupsieve.compile(selector), mode, limit))
+    return tuple(compiled)
+
+
+def compile_spec(spec):
+    """Compile every selector in `spec`; repeated calls with the same spec reuse the result."""
+    return _compile_items(tuple(spec.items()))
+
+
+# Function to build a strainer that keeps only the subtrees a spec looks at
+@lru_cache(maxsize=64)
+def _scope_classes(selectors):
+    classes = []
+    for selector in selectors:
+        match = _CLASS_ROOT.match(selector.strip())
+        if not match or any(symbol in selector for symbol in ',+~'):
+            return None  # Sibling or top-level tag selectors need the whole document
+        classes.append(match.group(1))
+    return tuple(dict.fromkeys(classes))
+
+
+def scope_strainer(spec):
+    """Return a SoupStrainer keeping the subtrees rooted at each selector's leading class.
+
+    Passing it as `parse_only` builds only those subtrees, so headers,
+    sidebars and footers never become Tag objects. Returns None when some
+    selector does not start with a class, in which case the whole page must
+    be parsed.
+    """
+    classes = _scope_classes(tuple(entry[0] for entry in spec.values()))
+    return SoupStrainer(class_=list(classes)) if classes else None
+
+
+# Function to extract every field from a BeautifulSoup tree
+def extract_fields(soup, spec, paragraph_filter=None):
+    """Run each field's precompiled selector once and read the field from its matches.
+
+    Paragraphs are matched lazily, so the scan stops at the `limit`-th one
+    that passes `paragraph_filter` instead of collecting every match first.
+    """
+    results = {}
+    for field, matcher, mode, limit in compile_spec(spec):
+        if mode == "text":
+            element = matcher.select_one(soup)
+            results[field] = element.get_text(strip=True) if element is not None else None
+        elif mode == "link_texts":
+            element = matcher.select_one(soup)
+            links = (a.get_text(strip=True) for a in element.find_all('a')) if element is not None else ()
+            results[field] = [text for text in links if text != "More"]
+        elif mode == "texts":
+            results[field] = [element.get_text(strip=True) for element in matcher.select(soup)]
+        elif mode == "paragraphs":
+            texts = (element.get_text(strip=True) for element in matcher.iselect(soup))
+            results[field] = list(islice((text for text in texts if paragraph_filter is None or paragraph_filter(text)), limit))
+    return results
+
+
+# Function to extract every field from a selectolax tree
+def extract_fields_selectolax(tree, spec, paragraph_filter=None):
+    """Same contract as `extract_fields`, using selectolax's native selector engine."""
+    results = {}
+    for field, entry in spec.items():
+        selector, mode = entry[0], entry[1]
+        limit = entry[2] if len(entry) > 2 else None
+        if mode == "text":
+            node = tree.css_first(selector)
+            results[field] = node_text(node) if node else None
+        elif mode == "link_texts":
+            node = tree.css_first(selector)
+            links = (node_text(a) for a in node.css('a')) if node else ()
+            results[field] = [text for text in links if text != "More"]
+        elif mode == "texts":
+            results[field] = [node_text(node) for node in tree.css(selector)]
+        elif mode == "paragraphs":
+            results[field] = []
+            for node in tree.css(selector):
+                text = node_text(node)
+                if paragraph_filter is None or paragraph_filter(text):
+                    results[field].append(text)
+                    if limit and len(results[field]) == limit:
+                        break
+    return results
+
+
+# Function to collect link targets from a listing page
+def extract_links(markup, css_selector, backend=None):
+    """Return the href of every element matching `css_selector` on a listing page.
+
+    Only the post-list container named by the selector's leading class is
+    built (see `scope_strainer`); with the selectolax backend, which is used
+    by default when installed, the page is matched natively instead.
+    Anchors without an href are skipped.
+    """
+    backend = backend or (SELECTOLAX_BACKEND if HAS_SELECTOLAX else None)
+    if backend == SELECTOLAX_BACKEND:
+        nodes = make_selectolax_tree(markup).css(css_selector)
+        return [node.attributes['href'] for node in nodes if node.attributes.get('href') is not None]
+    soup = make_soup(markup, backend, parse_only=scope_strainer({"links": (css_selector, "texts")}))
+    return [a['href'] for a in soup.select(css_selector) if a.has_attr('href')]
+
+
+# Function to collect the teaser cards of a listing page
+def extract_cards(markup, card_selector, card_fields, backend=None):
+    """Return one dict per element matching `card_selector`, with `card_fields` read inside it.
+
+    `card_fields` maps each field to `(selector, attribute)`: the attribute's
+    value, or the element's stripped text when the attribute is None. Missing
+    elements give "". When `card_selector` is a plain `tag` or `tag.class`
+    only the cards are built.
+    """
+    backend = backend or (SELECTOLAX_BACKEND if HAS_SELECTOLAX else None)
+    cards = []
+    if backend == SELECTOLAX_BACKEND:
+        for card in make_selectolax_tree(markup).css(card_selector):
+            row = {}
+            for field, (selector, attribute) in card_fields.items():
+                node = card.css_first(selector)
+                if node is None:
+                    row[field] = ""
+                else:
+                    row[field] = (node.attributes.get(attribute) or "") if attribute else node.text(deep=True).strip()
+            cards.append(row)
+        return cards
+
+    match = _SIMPLE_SELECTOR.match(card_selector.strip())
+    strainer = None
+    if match and any(match.groups()):
+        name, class_name = match.groups()
+        strainer = SoupStrainer(name, class_=class_name) if class_name else SoupStrainer(name)
+    for card in make_soup(markup, backend, parse_only=strainer).select(card_selector):
+        row = {}
+        for field, (selector, attribute) in card_fields.items():
+            element = card.select_one(selector)
+            if element is None:
+                row[field] = ""
+            else:
+                row[field] = element.get(attribute, "") if attribute else element.get_text().strip()
+        cards.append(row)
+    return cards
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Name of the cache folder created inside the save directory
+CACHE_DIR_NAME = ".http_cache"
+
+# Headers that describe the wire encoding rather than the stored (decoded) body
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class HttpCache:
+    """Persistent store of response bodies plus their ETag / Last-Modified validators."""
+
+    def __init__(self, directory):
+        self.directory = os.path.join(directory, CACHE_DIR_NAME)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def load(self, url):
+        """Return `(meta, body)` for a cached URL, or `(None, None)` if it is not cached."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+            with open(body_path, 'rb') as file:
+                body = file.read()
+        except (OSError, ValueError):
+            return None, None
+        return meta, body
+
+    def conditional_headers(self, meta):
+        """Build the If-None-Match / If-Modified-Since headers for a cached entry."""
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(self, url, response):
+        """Save a 200 response if the server gave us a validator to revalidate it with."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "encoding": response.encoding,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in SKIPPED_HEADERS},
+            "stored_at": time.time(),
+        }
+        meta_path, body_path = self._paths(url)
+        # Write to temporary files first so a crash never leaves a half-written entry
+        for path, payload in ((body_path, response.content), (meta_path, json.dumps(meta).encode('utf-8'))):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(payload)
+            os.replace(tmp_path, path)
+
+    def build_response(self, url, meta, body):
+        """Rebuild a 200 response from a cached entry after the server answered 304."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = body
+        response.encoding = meta.get("encoding")
+        response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+        response.from_cache = True
+        return response
@@ -0,0 +1,88 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+# Connection pool settings shared by every scraper
+POOL_CONNECTIONS = 10  # Number of hosts to keep a connection pool for
+POOL_MAXSIZE = 16  # Keep-alive connections kept open per host
+REQUEST_TIMEOUT = 30  # Seconds before a single request is abandoned
+
+# Headers sent with every request; Accept-Encoding advertises gzip/deflate,
+# plus brotli when a brotli decoder is installed
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36",
+    **make_headers(accept_encoding=True),
+}
+
+_lock = threading.Lock()
+_local = threading.local()
+_adapter = None
+
+
+# Function to build the shared connection pool adapter
+def _get_adapter():
+    """Return the adapter whose per-host pools are shared by every thread's session."""
+    global _adapter
+    with _lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        return _adapter
+
+
+# Function to tune the connection pools
+def configure(pool_connections=None, pool_maxsize=None):
+    """Resize the shared connection pools. Takes effect for sessions created afterwards."""
+    global POOL_CONNECTIONS, POOL_MAXSIZE, _adapter
+    with _lock:
+        if pool_connections is not None:
+            POOL_CONNECTIONS = int(pool_connections)
+        if pool_maxsize is not None:
+            POOL_MAXSIZE = int(pool_maxsize)
+        if _adapter is not None:
+            _adapter.close()
+        _adapter = None
+
+
+# Function to make sure each host pool can hold `size` connections
+def ensure_pool_size(size):
+    """Grow the per-host pool when more simultaneous requests per host are allowed."""
+    if size > POOL_MAXSIZE:
+        configure(pool_maxsize=size)
+
+
+# Function to get the calling thread's session
+def get_session():
+    """Return a per-thread session mounted on the shared keep-alive adapter."""
+    adapter = _get_adapter()
+    session = getattr(_local, "session", None)
+    if session is None or getattr(_local, "adapter", None) is not adapter:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+        _local.adapter = adapter
+    return session
+
+
+# Function to fetch a URL through the shared session
+def get(url, headers=None, timeout=REQUEST_TIMEOUT, cache=None, **kwargs):
+    """GET `url` over a pooled keep-alive connection with the shared headers.
+
+    When an `HttpCache` is given, a cached copy is revalidated with a
+    conditional request and served locally if the server answers 304.
+    """
+    if cache is None:
+        return get_session().get(url, headers=headers, timeout=timeout, **kwargs)
+
+    meta, body = cache.load(url)
+    request_headers = dict(headers or {})
+    if meta is not None:
+        request_headers.update(cache.conditional_headers(meta))
+    response = get_session().get(url, headers=request_headers, timeout=timeout, **kwargs)
+    if response.status_code == 304 and meta is not None:
+        return cache.build_response(url, meta, body)
+    cache.store(url, response)
+    return response
@@ -0,0 +1,181 @@
+import itertools
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of crawl jobs that run at the same time; later ones wait in the queue
+JOB_WORKERS = 2
+
+# Number of log lines each job keeps (older ones are dropped)
+LOG_LINES = 200
+
+# Job states
+QUEUED, RUNNING, FINISHED, FAILED, CANCELLED = "queued", "running", "finished", "failed", "cancelled"
+DONE_STATES = (FINISHED, FAILED, CANCELLED)
+
+
+# Function to format a duration
+def format_seconds(seconds):
+    """Format seconds as e.g. "1h 02m 03s"."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m {seconds:02d}s" if hours else f"{minutes}m {seconds:02d}s"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work function when the job was cancelled."""
+
+
+class Job:
+    """Progress, counts and log of one background job.
+
+    The work function updates the job from its worker thread; front ends read
+    `snapshot()` whenever they poll, so progress costs nothing until someone
+    looks at it.
+    """
+
+    def __init__(self, job_id, title):
+        self.id = job_id
+        self.title = title
+        self.status = QUEUED
+        self.stage = "Queued"
+        self.done = 0
+        self.total = None  # Unknown until the stage knows how much work it has
+        self.counts = Counter()
+        self.log_lines = deque(maxlen=LOG_LINES)
+        self.result = None
+        self.error = None
+        self.metrics = None  # RunMetrics of the work, when it records any
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._stage_started = None
+        self._cancel = threading.Event()
+        self._cancel_callbacks = []
+        self._lock = threading.Lock()
+
+    def set_stage(self, stage, total=None):
+        """Start a new stage of `total` work items (None when unknown)."""
+        with self._lock:
+            self.stage = stage
+            self.done = 0
+            self.total = total
+            self._stage_started = time.time()
+
+    def advance(self, done=None, total=None):
+        """Move the current stage to `done` items (one more when omitted)."""
+        with self._lock:
+            self.done = self.done + 1 if done is None else done
+            if total is not None:
+                self.total = total
+
+    def count(self, name, amount=1):
+        """Add `amount` to the counter `name` (e.g. saved, duplicates, errors)."""
+        with self._lock:
+            self.counts[name] += amount
+
+    def log(self, level, message):
+        """Keep `message` in the job log; `level` is "info", "warning" or "error"."""
+        with self._lock:
+            self.log_lines.append((time.time(), level, message))
+
+    def cancel(self):
+        """Ask the job to stop at its next checkpoint, and call every `on_cancel` callback."""
+        with self._lock:
+            self._cancel.set()
+            callbacks = list(self._cancel_callbacks)
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """Call `callback()` when the job is cancelled (at once if it already was), e.g. to set a stop event."""
+        with self._lock:
+            if not self._cancel.is_set():
+                self._cancel_callbacks.append(callback)
+                return
+        callback()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        """Raise JobCancelled when the job was cancelled; call between work items."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def eta(self):
+        """Seconds left in the current stage at its rate so far, or None when unknown."""
+        if not self.total or not self.done or self._stage_started is None:
+            return None
+        elapsed = time.time() - self._stage_started
+        return elapsed / self.done * (self.total - self.done)
+
+    def run(self, fn, *args, **kwargs):
+        """Run `fn(self, *args, **kwargs)` in the calling thread, recording its status and result."""
+        self.status, self.started = RUNNING, time.time()
+        try:
+            self.check()  # Cancelled while still queued
+            self.result = fn(self, *args, **kwargs)
+            self.status = FINISHED
+        except JobCancelled:
+            self.status = CANCELLED
+            self.log("warning", "Cancelled.")
+        except Exception as e:
+            self.status, self.error = FAILED, f"{e}"
+            self.log("error", traceback.format_exc())
+        finally:
+            self.finished = time.time()
+        return self.result
+
+    def snapshot(self):
+        """A consistent copy of the job's state for display."""
+        with self._lock:
+            return {
+                "id": self.id, "title": self.title, "status": self.status, "stage": self.stage,
+                "done": self.done, "total": self.total, "counts": dict(self.counts),
+                "log": list(self.log_lines), "result": self.result, "error": self.error,
+                "created": self.created, "started": self.started, "finished": self.finished,
+                "eta": self.eta() if self.status == RUNNING else None,
+                "metrics": self.metrics.to_dict() if self.metrics is not None else None,
+            }
+
+
+class JobTable:
+    """Run work functions in background threads and keep their `Job` records.
+
+    Jobs outlive the request (or Streamlit script run) that started them;
+    any caller holding the table can look them up by id. Threads rather than
+    processes, because the jobs mostly wait on the network and parse in their
+    own process pools, and the job records must be shared with the UI.
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="crawl-job")
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, title, fn, *args, **kwargs):
+        """Queue `fn(job, *args, **kwargs)`; its return value becomes `job.result`. Returns the Job."""
+        with self._lock:
+            job = Job(next(self._ids), title)
+            self._jobs[job.id] = job
+        self._executor.submit(job.run, fn, *args, **kwargs)
+        return job
+
+    def get(self, job_id):
+        """Return the job with `job_id`, or None."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        """Every job, newest first."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.id, reverse=True)
+
+    def running(self):
+        """Jobs that are queued or running."""
+        return [job for job in self.jobs() if job.status not in DONE_STATES]
@@ -0,0 +1,118 @@
+import bisect
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets; slower samples fall in a last, open bucket
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Stages recorded by the scraper:
+#   listing wait / download wait - time spent waiting for a free host slot (throttling)
+#   listing / download           - HTTP request time of listing pages and articles
+#   listing parse                - extracting article links or cards from a listing page
+#   write                        - saving an article's HTML to disk
+#   parse                        - parsing one article (cache hits are counted, not timed)
+#   export                       - writing one row to the export files
+
+
+class StageStats:
+    """Latency histogram, sample count and byte total of one stage."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.bytes = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds, size=None):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if size:
+            self.bytes += size
+
+    def percentile(self, fraction):
+        """Estimate the `fraction` quantile by interpolating inside its bucket, within the observed min and max."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for position, bucket in enumerate(self.buckets):
+            if bucket and seen + bucket >= rank:
+                lower = max(LATENCY_BUCKETS[position - 1] if position else 0.0, self.min)
+                upper = min(LATENCY_BUCKETS[position], self.max) if position < len(LATENCY_BUCKETS) else self.max
+                return lower + (upper - lower) * (rank - seen) / bucket
+            seen += bucket
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count, "total_seconds": self.total,
+            "mean_seconds": self.total / self.count if self.count else None,
+            "min_seconds": self.min, "max_seconds": self.max,
+            "p50_seconds": self.percentile(0.5), "p90_seconds": self.percentile(0.9),
+            "p99_seconds": self.percentile(0.99), "bytes": self.bytes, "histogram": list(self.buckets),
+        }
+
+
+class RunMetrics:
+    """Per-stage latency histograms, bytes, status codes and counters of one crawl run.
+
+    Safe to share between the download threads; parse times measured in
+    worker processes are reported back with the records and observed here.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._stages = {}
+        self._status_codes = Counter()
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, size=None):
+        """Record one `stage` sample of `seconds`, optionally with `size` bytes transferred."""
+        with self._lock:
+            if stage not in self._stages:
+                self._stages[stage] = StageStats()
+            self._stages[stage].observe(seconds, size)
+
+    @contextmanager
+    def timer(self, stage):
+        """Time the body of a `with` block as one `stage` sample."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def status(self, code):
+        """Count one HTTP response with status `code`."""
+        with self._lock:
+            self._status_codes[int(code)] += 1
+
+    def count(self, name, amount=1):
+        """Add `amount` to the counter `name` (e.g. retries, request errors, parse cache hits)."""
+        with self._lock:
+            self._counts[name] += amount
+
+    def to_dict(self):
+        """Everything recorded so far, ready for json.dumps."""
+        with self._lock:
+            return {
+                "started": self.started, "elapsed_seconds": time.time() - self.started,
+                "latency_buckets": list(LATENCY_BUCKETS),
+                "stages": {stage: stats.to_dict() for stage, stats in self._stages.items()},
+                "status_codes": {str(code): count for code, count in sorted(self._status_codes.items())},
+                "counts": {"retries": 0, **self._counts},
+            }
+
+    def save(self, path):
+        """Write the metrics to `path` as JSON."""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2)
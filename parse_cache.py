@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+from parser_backends import DEFAULT_BACKEND
+
+# Name of the cache database created inside the save directory
+CACHE_FILE_NAME = ".parse_cache.sqlite3"
+
+# Record fields that depend on where the file lives rather than on its content
+LOCATION_FIELDS = ("Article URL", "Original URL", "File Name")
+
+
+class ParseCache:
+    """Extracted article records keyed on file content hash plus extractor version and parser backend."""
+
+    def __init__(self, directory, extractor_version, selectors=(), backend=None):
+        self.path = os.path.join(directory, CACHE_FILE_NAME)
+        # Any change to the extraction logic, the selectors or the parser backend gives a different key space
+        key = [extractor_version, list(selectors), backend or DEFAULT_BACKEND]
+        self.version = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records (content_hash TEXT, version TEXT, record TEXT, "
+            "PRIMARY KEY (content_hash, version))"
+        )
+
+    def get(self, content_hash):
+        """Return the cached record for a file's content, or None if it must be parsed."""
+        row = self._conn.execute(
+            "SELECT record FROM records WHERE content_hash = ? AND version = ?", (content_hash, self.version)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cached_hashes(self):
+        """Return the content hashes that already have a record for this extractor version."""
+        rows = self._conn.execute("SELECT content_hash FROM records WHERE version = ?", (self.version,))
+        return {row[0] for row in rows}
+
+    def put_many(self, items):
+        """Store `(content_hash, record)` pairs, leaving out the location-specific fields."""
+        rows = [
+            (content_hash, self.version,
+             json.dumps({key: value for key, value in record.items() if key not in LOCATION_FIELDS}))
+            for content_hash, record in items
+        ]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?)", rows)
+
+    def prune(self):
+        """Drop records written by older extractor versions, other selectors or other backends."""
+        with self._conn:
+            self._conn.execute("DELETE FROM records WHERE version != ?", (self.version,))
+
+    def close(self):
+        self._conn.close()
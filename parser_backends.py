@@ -0,0 +1,64 @@
+from bs4 import BeautifulSoup
+
+# lxml and selectolax are optional; fall back to the standard library parser without them
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    LexborHTMLParser = None
+    HAS_SELECTOLAX = False
+
+# BeautifulSoup tree builders, from slowest to fastest
+SOUP_BACKENDS = ["html.parser", "lxml"]
+
+# Native fast path that skips BeautifulSoup entirely
+SELECTOLAX_BACKEND = "selectolax"
+
+# Backend used when the caller does not choose one
+DEFAULT_BACKEND = "lxml" if HAS_LXML else "html.parser"
+
+
+# Function to list the backends usable in this environment
+def available_backends():
+    """Return the parser backends whose libraries are installed."""
+    backends = ["html.parser"]
+    if HAS_LXML:
+        backends.append("lxml")
+    if HAS_SELECTOLAX:
+        backends.append(SELECTOLAX_BACKEND)
+    return backends
+
+
+# Function to build a BeautifulSoup tree with the chosen backend
+def make_soup(markup, backend=None, parse_only=None):
+    """Parse `markup` with BeautifulSoup using `backend` ("html.parser" or "lxml").
+
+    The selectolax backend has no BeautifulSoup tree, so callers that need a
+    soup get the fastest BeautifulSoup builder instead.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in SOUP_BACKENDS or (backend == "lxml" and not HAS_LXML):
+        backend = DEFAULT_BACKEND
+    return BeautifulSoup(markup, backend, parse_only=parse_only)
+
+
+# Function to parse markup with selectolax
+def make_selectolax_tree(markup):
+    """Parse `markup` with selectolax's lexbor engine."""
+    if not HAS_SELECTOLAX:
+        raise ImportError("The selectolax backend needs `pip install selectolax`.")
+    if isinstance(markup, bytes):
+        markup = markup.decode('utf-8', errors='replace')
+    return LexborHTMLParser(markup)
+
+
+# Function to get stripped text from a selectolax node
+def node_text(node):
+    """Equivalent of BeautifulSoup's `get_text(strip=True)` for a selectolax node."""
+    return node.text(deep=True, separator='', strip=True)
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import http_client
+from article_parser import CACHE_BATCH_SIZE, add_transaction_info, parse_article
+from dedup import hash_text
+from downloader import HostLimiter, MAX_WORKERS, PER_HOST_LIMIT, REQUEST_DELAY, fetch_article, write_html
+
+# One streamed article: `record` is the parsed row, `duplicate_of` names the stored
+# copy when the content was already collected, and `error` explains a failure
+ArticleResult = namedtuple("ArticleResult", ["link", "file_name", "record", "error", "duplicate_of"])
+
+
+# Function to fetch, parse and optionally save articles as a stream
+def stream_articles(links, selectors, directory=None, filename_fn=None, start_suffix=1, original_urls=None,
+                    max_workers=MAX_WORKERS, per_host_limit=PER_HOST_LIMIT, delay=REQUEST_DELAY,
+                    cache=None, backend=None, parse_workers=1, index=None, category=None, parse_cache=None,
+                    limiter=None, metrics=None, stop=None):
+    """Download `links` concurrently and parse each article in memory as soon as it arrives.
+
+    Yields an `ArticleResult` per link as soon as its record is ready, so the
+    caller can export rows while later downloads are still in flight. When
+    `directory` is given the raw HTML is also written there by a background
+    writer thread, using the same filenames as `download_articles`; the
+    record's "Article URL" is then the file path, otherwise the link.
+    `index` (an ArticleIndex) and `parse_cache` (a ParseCache) are only used
+    from the calling thread; `category` is passed to the index as is, so it
+    may map each link to its categories. A shared `limiter` (HostLimiter)
+    replaces the one built from `per_host_limit`. A `RunMetrics` as `metrics`
+    records download, write and parse timings. Records read from the parse
+    cache get their transaction fields in batches of up to CACHE_BATCH_SIZE,
+    handed over whenever no download is ready. Setting the `stop` event (e.g.
+    when a job is cancelled) ends the downloads' throttle and retry waits at
+    once; it is also set when the caller stops iterating.
+    """
+    title_css, date_css, tags_css, companies_css = selectors
+    limiter = limiter or HostLimiter(per_host_limit)
+    http_client.ensure_pool_size(limiter.limit)
+    if stop is None:
+        stop = threading.Event()
+    seen_hashes = set()  # Run-local duplicate check when there is no on-disk index
+    write_futures = []
+    cached = []  # (link, file name, record) read from the parse cache, awaiting transaction extraction
+
+    def finish(record):
+        """Move a freshly parsed record into the parse cache (if any) and return it."""
+        content_hash = record.pop("_content_hash")
+        parse_seconds = record.pop("_parse_seconds")
+        if metrics is not None:
+            metrics.observe("parse", parse_seconds)
+        if parse_cache is not None:
+            parse_cache.put_many([(content_hash, record)])
+        return record
+
+    def flush_cached():
+        """Fill the transaction fields of the cached records in one vectorized pass and hand them over."""
+        add_transaction_info([record for _, _, record in cached])  # Cached records may predate a regex change
+        results = [ArticleResult(link, file_name, record, None, None) for link, file_name, record in cached]
+        cached.clear()
+        return results
+
+    fetch_pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)))
+    write_pool = ThreadPoolExecutor(max_workers=1) if directory is not None else None
+    parse_pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 1 else None
+    try:
+        pending = {}
+        for offset, link in enumerate(links):
+            file_name = filename_fn(link, start_suffix + offset) if directory is not None else None
+            future = fetch_pool.submit(fetch_article, link, limiter, None, delay, cache, stop, metrics)
+            pending[future] = ("fetch", link, file_name)
+
+        while pending:
+            finished, _ = wait(pending, timeout=0 if cached else None, return_when=FIRST_COMPLETED)
+            if not finished:
+                yield from flush_cached()  # Nothing else is ready, so don't hold these rows back
+                continue
+            for future in finished:
+                stage, link, file_name = pending.pop(future)
+                if stage == "parse":
+                    yield ArticleResult(link, file_name, finish(future.result()), None, None)
+                    continue
+
+                text, error = future.result()
+                if error:
+                    yield ArticleResult(link, file_name, None, error, None)
+                    continue
+
+                # Keep one copy per article: skip content that is already stored
+                content_hash = hash_text(text)
+                if index is not None:
+                    kept = index.register(link, file_name, content_hash, category)
+                    if kept != file_name:
+                        yield ArticleResult(link, file_name, None, None, kept)
+                        continue
+                elif content_hash in seen_hashes:
+                    yield ArticleResult(link, file_name, None, None, "an article from this run")
+                    continue
+                seen_hashes.add(content_hash)
+
+                article_url = link
+                if directory is not None:
+                    article_url = os.path.join(directory, file_name)
+                    write_futures.append(write_pool.submit(write_html, text, article_url, metrics))
+                    if original_urls is not None:
+                        original_urls[file_name] = link  # Store the original URL in the mapping
+
+                record = parse_cache.get(content_hash) if parse_cache is not None else None
+                if record is not None:
+                    if metrics is not None:
+                        metrics.count("parse cache hits")
+                    record.update({"Article URL": article_url, "Original URL": link, "File Name": file_name})
+                    cached.append((link, file_name, record))
+                    if len(cached) >= CACHE_BATCH_SIZE:
+                        yield from flush_cached()
+                    continue
+
+                job = (text, title_css, date_css, tags_css, companies_css, article_url, link, backend)
+                if parse_pool is not None:
+                    parse_future = parse_pool.submit(_parse_streamed, job, file_name, content_hash)
+                    pending[parse_future] = ("parse", link, file_name)
+                else:
+                    record = finish(_parse_streamed(job, file_name, content_hash))
+                    yield ArticleResult(link, file_name, record, None, None)
+        yield from flush_cached()
+    finally:
+        stop.set()  # Downloads still waiting on the host or a retry give up instead of holding up the shutdown
+        fetch_pool.shutdown(cancel_futures=True)
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+        if write_pool is not None:
+            write_pool.shutdown(wait=True)  # Make sure every queued file reaches the disk
+
+    for future in write_futures:
+        error = future.result()
+        if error:
+            yield ArticleResult(None, None, None, error, None)
+
+
+# Function to parse one streamed article (top-level so the process pool can pickle it)
+def _parse_streamed(job, file_name, content_hash):
+    started = time.perf_counter()
+    record = parse_article(*job)
+    record["File Name"] = file_name
+    record["_content_hash"] = content_hash
+    record["_parse_seconds"] = time.perf_counter() - started
+    return record
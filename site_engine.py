@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+from crawl_state import Frontier, iter_new_links
+from downloader import HostLimiter, MAX_RATE, MAX_WORKERS, PER_HOST_LIMIT, REQUEST_DELAY, download_articles, fetch_article
+from field_extractor import extract_cards, extract_links
+
+
+class SiteEngine:
+    """Scrape any site described by a `SiteDefinition` (see sites.py).
+
+    Listing pages and article downloads share one thread pool size, one
+    per-host limiter, the politeness delay and the HTTP cache, so adding a
+    site only means writing its definition. Each host's request rate adapts
+    to its responses, up to `max_rate` requests per second. A `RunMetrics`
+    as `metrics` records the listing and download timings. Setting the
+    `stop` event ends the listing requests' waits and skips the rest.
+    """
+
+    def __init__(self, site, max_workers=MAX_WORKERS, per_host_limit=PER_HOST_LIMIT, delay=REQUEST_DELAY,
+                 cache=None, backend=None, metrics=None, max_rate=MAX_RATE, stop=None):
+        self.site = site
+        self.max_workers = max(1, int(max_workers))
+        self.limiter = HostLimiter(per_host_limit, max_rate=max_rate)
+        self.delay = delay
+        self.cache = cache
+        self.backend = backend  # Listing pages default to the fastest installed parser
+        self.metrics = metrics
+        self.stop = stop
+        http_client.ensure_pool_size(self.limiter.limit)  # One keep-alive connection per host slot
+
+    def listing_urls(self, category, pages):
+        """Return the URLs of the first `pages` listing pages of `category` (a UI label or slug)."""
+        slug = self.site.categories.get(category, category) if self.site.categories else ""
+        urls = []
+        for page in range(1, pages + 1):
+            if page == 1 and self.site.first_page_url:
+                urls.append(self.site.first_page_url.format(category=slug))
+            else:
+                urls.append(self.site.listing_url.format(category=slug, page=page))
+        return urls
+
+    def fetch(self, url):
+        """Download one page through the shared limiter and cache; returns `(text, error)`."""
+        return fetch_article(url, self.limiter, None, self.delay, self.cache, self.stop, self.metrics, stage="listing")
+
+    def _extract(self, extract_fn, *args):
+        """Run a listing page extractor, timing it as "listing parse" when metrics are recorded."""
+        if self.metrics is None:
+            return extract_fn(*args)
+        with self.metrics.timer("listing parse"):
+            return extract_fn(*args)
+
+    def fetch_pages(self, urls):
+        """Yield `(url, text, error)` for each of `urls` in order, downloading them concurrently."""
+        urls = list(urls)
+        if not urls:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            yield from ((url, text, error) for url, (text, error) in zip(urls, executor.map(self.fetch, urls)))
+
+    def page_links(self, url):
+        """Return `(links, error)` for one listing page."""
+        text, error = self.fetch(url)
+        if error:
+            return [], error
+        return self._extract(extract_links, text, self.site.link_selector, self.backend), None
+
+    def links(self, urls):
+        """Yield `(url, links, error)` for each listing page in order."""
+        for url, text, error in self.fetch_pages(urls):
+            yield url, ([] if error else self._extract(extract_links, text, self.site.link_selector, self.backend)), error
+
+    def cards(self, urls):
+        """Yield `(url, cards, error)` for each listing page in order; cards are dicts of `card_fields`."""
+        for url, text, error in self.fetch_pages(urls):
+            cards = [] if error else self._extract(extract_cards, text, self.site.card_selector, self.site.card_fields, self.backend)
+            yield url, cards, error
+
+    def crawl_categories(self, categories, pages, known=None):
+        """Discover the articles of several categories at once into one shared `Frontier`.
+
+        Each category walks its listing pages in its own thread; every request
+        still goes through the shared per-host limiter. With `known` (category
+        -> set of collected links, e.g. from SeenArticles) a category skips
+        those links and stops paging at its first page that lists only known
+        articles. Returns `(frontier, errors)`.
+        """
+        categories = list(categories)
+        errors = []
+        frontier = Frontier()
+        if known is None:
+            # Every listing page of every category is fetched concurrently
+            jobs = [(category, url) for category in categories for url in self.listing_urls(category, pages)]
+            for (category, _), (url, links, error) in zip(jobs, self.links(url for _, url in jobs)):
+                if error:
+                    errors.append(error)
+                frontier.add(category, links)
+            return frontier, errors
+
+        def walk(category):
+            def scrape(url):
+                links, error = self.page_links(url)
+                if error:
+                    errors.append(error)
+                return links
+
+            urls = self.listing_urls(category, pages)
+            return [link for _, new_links in iter_new_links(urls, scrape, known.get(category, set())) for link in new_links]
+
+        if categories:
+            # Pages of one category are walked in order; categories run side by side
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(categories))) as executor:
+                # Added in category order, so the frontier is the same from run to run
+                for category, links in zip(categories, executor.map(walk, categories)):
+                    frontier.add(category, links)
+        return frontier, errors
+
+    def download(self, links, directory, filename_fn, original_urls=None, start_suffix=1, stop=None):
+        """Save article pages with `download_articles`, under the same limits as the listing pages."""
+        return download_articles(
+            links, directory, filename_fn, original_urls, start_suffix, max_workers=self.max_workers,
+            delay=self.delay, cache=self.cache, limiter=self.limiter, metrics=self.metrics, stop=stop
+        )
@@ -0,0 +1,71 @@
+from collections import namedtuple
+
+# Declarative description of a news site:
+#   listing_url       - listing page pattern with `{category}` and `{page}` placeholders
+#   first_page_url    - pattern for page 1 when it differs from `listing_url` (or None)
+#   categories        - UI label -> `{category}` slug; empty for sites without categories
+#   card_selector     - one element per article teaser on a listing page
+#   card_fields       - {field: (selector inside the card, attribute or None for text)}
+#   link_selector     - anchors of the articles on a listing page
+#   article_selectors - selectors of the article page fields (title, date, tags, companies),
+#                       or None when only listing cards are collected
+SiteDefinition = namedtuple("SiteDefinition", [
+    "name", "listing_url", "first_page_url", "categories", "card_selector", "card_fields",
+    "link_selector", "article_selectors",
+])
+
+COMMERCIAL_SEARCH = SiteDefinition(
+    name="Commercial Search",
+    listing_url="https://www.commercialsearch.com/news/{category}/page/{page}/",
+    first_page_url="https://www.commercialsearch.com/news/{category}/",
+    categories={
+        "Office": "office",
+        "Industrial": "industrial",
+        "Retail": "retail",
+        "Medical Office": "medical-office",
+        "Coworking": "coworking",
+        "Data Centers": "data-centers",
+    },
+    card_selector="article",
+    card_fields={"title": ("h2", None), "date": ("time", "datetime"), "link": ("a", "href"), "intro": ("p", None)},
+    link_selector=".cpe-posts-category-page .fl-post-title a",
+    article_selectors={
+        "title": ".fl-node-r05xkta16lp9 .fl-heading-text",
+        "date": ".fl-post-info-date",
+        "tags": ".post_categories",
+        "companies": ".fl-post-info-terms a",
+    },
+)
+
+MULTI_HOUSING_NEWS = SiteDefinition(
+    name="Multi-Housing News",
+    listing_url="https://www.multihousingnews.com/tag/{category}/page/{page}/",
+    first_page_url=None,
+    categories={
+        slug: slug for slug in [
+            "market-rate", "luxury", "affordable-housing", "student-housing", "senior-housing",
+            "manufactured-housing", "condo", "military-housing", "self-storage", "single-family-rental",
+        ]
+    },
+    card_selector="article",
+    card_fields={
+        "title": ("h2.entry-title", None), "date": ("time", "datetime"), "link": ("a", "href"),
+        "intro": ("div.entry-excerpt", None),
+    },
+    link_selector="article h2.entry-title a",
+    article_selectors=None,
+)
+
+TRADED = SiteDefinition(
+    name="Traded",
+    listing_url="https://traded.co/page/{page}/",
+    first_page_url=None,
+    categories={},
+    card_selector="div.content-card",
+    card_fields={"title": ("h2", None), "date": ("span.date", None), "link": ("a", "href"), "intro": ("p", None)},
+    link_selector="div.content-card a",
+    article_selectors=None,
+)
+
+# Every site the engine can scrape, by display name
+SITES = {site.name: site for site in (MULTI_HOUSING_NEWS, COMMERCIAL_SEARCH, TRADED)}
@@ -0,0 +1,206 @@
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from collections import Counter, namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit
+
+# Articles per listing page, as on the real category pages
+PAGE_SIZE = 10
+
+# Approximate size of each synthetic article page, so parsing costs about as much as a real one
+ARTICLE_KB = 80
+
+# How the stand-in site behaves:
+#   categories  - category slugs served under /news/<slug>/
+#   pages       - listing pages per category; later pages answer 404 like the real site
+#   corpus      - directory of recorded article HTML files (e.g. an earlier crawl), or None for synthetic pages
+#   latency     - seconds added to every response, plus up to `jitter` seconds at random
+#   rate_429    - share of requests answered "429 Too Many Requests" with a Retry-After header
+#   rate_5xx    - share of requests answered 500, 502 or 503 (503 also carries Retry-After)
+#   retry_after - Retry-After value (seconds) of injected 429/503 responses
+#   seed        - seed of the fault injection and synthetic content, so runs are repeatable
+SiteConfig = namedtuple("SiteConfig", [
+    "categories", "pages", "corpus", "latency", "jitter", "rate_429", "rate_5xx", "retry_after", "seed",
+], defaults=[None, 0.0, 0.0, 0.0, 0.0, 1, 0])
+
+REGIONS = ["Northeast", "Southeast", "Midwest", "West", "Southwest"]
+CITIES = ["Dallas, Texas", "Chicago, Illinois", "Phoenix, Arizona", "Atlanta, Georgia", "Newark, New Jersey"]
+FILLER = "<div class='fl-module'><p class='chrome'>Related coverage, newsletter sign-up and navigation.</p></div>\n"
+
+
+# Function to build a synthetic article page
+def synthetic_article(number, category, rng):
+    """An article page with the Commercial Search structure the parser's selectors expect."""
+    amount = rng.randint(5, 900) / 10
+    square_feet = rng.randint(20, 900) * 1000
+    body = (
+        f"<div class='fl-node-r05xkta16lp9'><h1 class='fl-heading-text'>{category.title()} deal {number}</h1></div>"
+        f"<span class='fl-post-info-date'>January {1 + number % 28}, 2025</span>"
+        f"<div class='post_categories'><a>{REGIONS[number % len(REGIONS)]}</a><a>{category.replace('-', ' ').title()}</a></div>"
+        f"<div class='fl-post-info-terms'><a>Company {number}</a><a>Partner {number % 7}</a></div>"
+        f"<div class='fl-post-content'>"
+        f"<p>Company {number} acquired a {square_feet:,}-square-foot property in {CITIES[number % len(CITIES)]} "
+        f"for ${amount:.2f} million, according to public records reviewed this week.</p>"
+        f"<p>The asset was fully leased at closing and sits close to the interstate and several transit lines.</p>"
+        f"<p>Partner {number % 7} arranged the financing on behalf of the buyer.</p></div>"
+    )
+    padding = FILLER * max(0, (ARTICLE_KB * 1024 - len(body)) // len(FILLER))
+    return f"<html><head><title>Deal {number}</title></head><body><header>{FILLER}</header>{body}<footer>{padding}</footer></body></html>"
+
+
+# Function to build a listing page
+def listing_page(base_url, category, numbers):
+    """A category page whose posts match both the link selector and the card selectors."""
+    posts = "".join(
+        f"<article><h2 class='fl-post-title'><a href='{base_url}/news/{category}-deal-{number}/'>{category} deal {number}</a></h2>"
+        f"<time datetime='2025-01-{1 + number % 28:02d}'></time><p>Intro of deal {number}</p></article>"
+        for number in numbers
+    )
+    return f"<html><body><nav>{FILLER}</nav><div class='cpe-posts-category-page'>{posts}</div></body></html>"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serve /news/<category>/, /news/<category>/page/<n>/ and /news/<category>-deal-<n>/ from the config."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real site
+    disable_nagle_algorithm = True  # Headers and body are separate writes; don't let them wait for an ACK
+
+    def do_GET(self):
+        site = self.server.site
+        if self.path == "/__stats":
+            return self.reply(200, json.dumps(site.stats()).encode(), {"Content-Type": "application/json"}, False)
+        fault = site.inject_fault()
+        if site.config.latency or site.config.jitter:
+            time.sleep(site.config.latency + site.rng_uniform(0, site.config.jitter))
+        if fault:
+            headers = {"Retry-After": str(site.config.retry_after)} if fault in (429, 503) else {}
+            return self.reply(fault, b"", headers)
+        body = site.page(self.path)
+        if body is None:
+            return self.reply(404, b"Not found")
+        self.reply(200, body.encode("utf-8"), {"Content-Type": "text/html; charset=utf-8"})
+
+    def reply(self, status, body, headers=None, counted=True):
+        if counted:
+            self.server.site.count(status)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # Thousands of requests per run; the counters in /__stats summarise them
+
+
+class StandInSite:
+    """Pages, fault injection and response counters of one stand-in site."""
+
+    def __init__(self, config, base_url):
+        self.config = config
+        self.base_url = base_url
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self._statuses = Counter()
+        self._corpus = []
+        if config.corpus:
+            self._corpus = sorted(
+                os.path.join(config.corpus, name) for name in os.listdir(config.corpus) if name.endswith(".html")
+            )
+
+    def rng_uniform(self, low, high):
+        with self._lock:
+            return self._rng.uniform(low, high)
+
+    def inject_fault(self):
+        """Return the status code of an injected error, or None to serve the page."""
+        with self._lock:
+            draw = self._rng.random()
+            if draw < self.config.rate_429:
+                return 429
+            if draw < self.config.rate_429 + self.config.rate_5xx:
+                return self._rng.choice((500, 502, 503))
+        return None
+
+    def count(self, status):
+        with self._lock:
+            self._statuses[status] += 1
+
+    def stats(self):
+        with self._lock:
+            return {"status_codes": {str(status): count for status, count in sorted(self._statuses.items())}}
+
+    def page(self, path):
+        """Return the HTML for `path`, or None when the real site would answer 404."""
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if len(parts) < 2 or parts[0] != "news":
+            return None
+        slug = parts[1]
+        if slug in self.config.categories and len(parts) in (2, 4):
+            page = 1 if len(parts) == 2 else int(parts[3]) if parts[2] == "page" and parts[3].isdigit() else 0
+            if not 1 <= page <= self.config.pages:
+                return None
+            first = (self.config.categories.index(slug) * self.config.pages + page - 1) * PAGE_SIZE
+            return listing_page(self.base_url, slug, range(first, first + PAGE_SIZE))
+        category, _, number = slug.rpartition("-deal-")
+        if category in self.config.categories and number.isdigit() and len(parts) == 2:
+            number = int(number)
+            if self._corpus:
+                with open(self._corpus[number % len(self._corpus)], encoding="utf-8") as file:
+                    return file.read()
+            return synthetic_article(number, category, random.Random(self.config.seed * 1000003 + number))
+        return None
+
+
+# Function to run the stand-in server (the target of the server process)
+def _serve(config, port_queue, host):
+    server = ThreadingHTTPServer((host, 0), StandInHandler)
+    server.daemon_threads = True
+    server.site = StandInSite(config, f"http://{host}:{server.server_port}")
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+class StandInServer:
+    """Run a stand-in site in its own process, so serving it does not skew the scraper's CPU or memory.
+
+    Use as a context manager; `site_for(definition)` points a SiteDefinition
+    (see sites.py) at the server, keeping its `/news/<category>/page/<n>/`
+    URL layout.
+    """
+
+    def __init__(self, config, host="127.0.0.1"):
+        self.config = config
+        self.host = host
+        self.base_url = None
+        self._process = None
+
+    def start(self):
+        port_queue = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=_serve, args=(self.config, port_queue, self.host), daemon=True)
+        self._process.start()
+        self.base_url = f"http://{self.host}:{port_queue.get(timeout=30)}"
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def site_for(self, definition):
+        """A copy of `definition` whose listing URLs point at this server."""
+        def local(url):
+            return url and urlunsplit(urlsplit(self.base_url)[:2] + urlsplit(url)[2:])
+        return definition._replace(listing_url=local(definition.listing_url), first_page_url=local(definition.first_page_url))
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from article_parser import add_transaction_info, extract_transaction_info, extract_transactions
+
+PARAGRAPHS = [
+    "Company 4 acquired a 120,000-square-foot property in Dallas, Texas for $12.50 million, records show.",
+    "The buyer paid $1,250 million for 2,500,000 square feet in Chicago, Illinois and Phoenix, Arizona.",
+    "A $7 million loan financed the 45,000-square-foot asset in Newark, New Jersey.",
+    "The sale closed for $3.5 million in Atlanta, Georgia.",
+    "No figures were disclosed.",
+    "",
+    None,
+]
+
+
+# Function to read one row of extract_transactions the way extract_transaction_info reports it
+def as_info(row):
+    def value(field):
+        return None if pd.isna(row[field]) else row[field]
+    return {
+        "Transaction Amount": value("Transaction Amount"),
+        "Transaction Amount (USD)": value("Transaction Amount (USD)"),
+        "Square Footage": value("Square Footage"),
+        "Asset Descriptor": row["Asset Descriptor"],
+    }
+
+
+def test_vectorized_extraction_matches_the_per_article_one():
+    batch = extract_transactions(pd.Series(PARAGRAPHS, dtype=object))
+    for paragraphs, (_, row) in zip(PARAGRAPHS, batch.iterrows()):
+        expected = extract_transaction_info(paragraphs)
+        expected.pop("Companies Involved")
+        expected["Asset Descriptor"] = ", ".join(expected["Asset Descriptor"])  # The batch joins them for export
+        assert as_info(row) == expected, paragraphs
+
+
+def test_add_transaction_info_fills_records_with_plain_values():
+    records = add_transaction_info([{"Combined Paragraphs": text} for text in PARAGRAPHS])
+    assert records[0]["Transaction Amount (USD)"] == 12.5e6
+    assert records[0]["Square Footage"] == 120000
+    assert records[4]["Transaction Amount"] is None
+    assert records[6]["Square Footage"] is None
+    assert add_transaction_info([]) == []
@@ -0,0 +1,62 @@
+import pytest
+
+from classifier import Classifier, DEFAULT_RULES
+
+TAGS = [
+    "Medical Office", "Office", "Industrial", "Retail", "Data Centers", "Coworking", "Northeast", "Mid-Atlantic",
+    "medical office buildings", "Retail & Industrial", "Office-to-Industrial Conversions", "Multifamily",
+    "CRE Finance", "west", "Southwest", "", "OFFICE", "Flex Industrial", "Coworking Office Space",
+]
+
+PARAGRAPHS = [
+    "Company 4 acquired a 120,000-square-foot property in Dallas, Texas for $12.50 million.",
+    "By Jane Doe", "Posted on January 5, 2025", "Short text.", "The asset was fully leased at closing.",
+    "Updated: the deal closed on Friday after months of negotiation.", "Nearby: a new transit line.",
+]
+
+
+# The keyword loops the classifier replaced, kept as the reference behaviour
+def old_asset_type(tags):
+    for tag in tags:
+        for keyword in DEFAULT_RULES["asset_types"]:
+            if keyword.lower() in tag.lower():
+                return keyword
+    return None
+
+
+def old_region(tags):
+    for tag in tags:
+        if tag in DEFAULT_RULES["regions"]:
+            return tag
+    return "Unknown"
+
+
+def old_is_content(text):
+    if len(text) < 20:
+        return False
+    return not any(keyword.lower() in text.lower() for keyword in DEFAULT_RULES["metadata_keywords"])
+
+
+@pytest.mark.parametrize("tag", TAGS)
+def test_asset_type_matches_the_keyword_loop(tag):
+    assert Classifier().asset_type([tag]) == old_asset_type([tag])
+
+
+def test_medical_office_is_office_like_before():
+    classifier = Classifier()
+    assert classifier.asset_type(["Medical Office"]) == "Office"
+    assert classifier.asset_type(["Multifamily", "Medical Office", "Retail"]) == old_asset_type(["Multifamily", "Medical Office", "Retail"])
+
+
+def test_region_and_content_match_the_keyword_loops():
+    classifier = Classifier()
+    for start in range(len(TAGS)):
+        assert classifier.region(TAGS[start:]) == old_region(TAGS[start:])
+    for paragraph in PARAGRAPHS:
+        assert classifier.is_content(paragraph) == old_is_content(paragraph)
+
+
+def test_rules_override_changes_priority_and_fingerprint():
+    classifier = Classifier({"asset_types": ["Medical Office", "Office"]})
+    assert classifier.asset_type(["Medical Office"]) == "Medical Office"
+    assert classifier.fingerprint != Classifier().fingerprint
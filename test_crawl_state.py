@@ -0,0 +1,66 @@
+import json
+import os
+import time
+
+from crawl_state import CrawlJournal, Frontier, JOURNAL_FILE_NAME
+
+KEY = {"site": "Commercial Search", "categories": ["Office"], "pages": 1}
+
+
+# Function to write a journal as an interrupted run would leave it
+def interrupted_journal(directory, key=KEY, part=None):
+    frontier = Frontier()
+    frontier.add("Office", ["https://example.com/a/", "https://example.com/b/"])
+    journal = CrawlJournal(directory)
+    journal.start(key)
+    journal.discovered(frontier)
+    journal.stored("https://example.com/a/", "a_1.html")
+    if part is not None:
+        journal.export_file(os.path.join(directory, "parquet", "*", "*", part))
+    journal.close()
+    return journal
+
+
+def test_interrupted_run_is_resumed_with_what_it_did(tmp_path):
+    interrupted_journal(str(tmp_path))
+    resume = CrawlJournal(str(tmp_path)).interrupted(KEY)
+    assert resume.frontier == [("https://example.com/a/", ["Office"]), ("https://example.com/b/", ["Office"])]
+    assert resume.stored == [("https://example.com/a/", "a_1.html", True)]
+
+
+def test_finished_or_other_runs_are_not_resumed(tmp_path):
+    journal = interrupted_journal(str(tmp_path))
+    assert journal.interrupted({**KEY, "pages": 2}) is None
+    journal.start(KEY, journal.interrupted(KEY))
+    journal.finish()
+    journal.close()
+    assert journal.interrupted(KEY) is None
+
+
+def test_run_older_than_max_age_is_not_resumed(tmp_path):
+    journal = interrupted_journal(str(tmp_path))
+    assert journal.interrupted(KEY, max_age=60) is not None
+    with open(tmp_path / JOURNAL_FILE_NAME, encoding="utf-8") as file:
+        entries = [json.loads(line) for line in file]
+    entries[0]["started"] = time.time() - 120
+    with open(tmp_path / JOURNAL_FILE_NAME, "w", encoding="utf-8") as file:
+        file.writelines(json.dumps(entry) + "\n" for entry in entries)
+    assert journal.interrupted(KEY, max_age=60) is None
+
+
+def test_line_cut_short_by_a_crash_keeps_the_entries_before_it(tmp_path):
+    interrupted_journal(str(tmp_path))
+    with open(tmp_path / JOURNAL_FILE_NAME, "a", encoding="utf-8") as file:
+        file.write('{"event": "stored", "link": "https://exa')
+    assert len(CrawlJournal(str(tmp_path)).interrupted(KEY).stored) == 1
+
+
+def test_new_run_removes_the_partial_exports_of_the_old_one(tmp_path):
+    partition = tmp_path / "parquet" / "category=Office" / "crawl_date=2026-01-01"
+    partition.mkdir(parents=True)
+    (partition / ".part-1.parquet.tmp").write_bytes(b"partial")
+    (partition / "part-0.parquet").write_bytes(b"published")
+    journal = interrupted_journal(str(tmp_path), part=".part-1.parquet.tmp")
+    journal.start({**KEY, "pages": 2})
+    journal.close()
+    assert sorted(os.listdir(partition)) == ["part-0.parquet"]
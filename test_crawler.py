@@ -0,0 +1,144 @@
+import csv
+import glob
+import multiprocessing
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from crawler import CrawlSettings, run_crawl
+from dedup import ArticleIndex
+from exporters import CsvExporter
+from jobs import CANCELLED, FAILED, FINISHED, Job, JobTable
+from sites import COMMERCIAL_SEARCH
+from standin_site import SiteConfig, StandInServer
+
+
+# Two concurrent crawls of one directory must not overwrite each other's files
+def test_concurrent_crawls_of_one_directory_keep_every_article(tmp_path):
+    slugs = list(COMMERCIAL_SEARCH.categories.values())[:2]
+    with StandInServer(SiteConfig(slugs, 2, latency=0.01)) as server:
+        site = server.site_for(COMMERCIAL_SEARCH)
+        first, second = [label for label, slug in site.categories.items() if slug in slugs]
+        table = JobTable(max_workers=2)
+        jobs = [
+            table.submit(category, run_crawl, CrawlSettings(site, [category], 2, str(tmp_path), export_format="CSV (.csv)"))
+            for category in (first, second)
+        ]
+        deadline = time.time() + 120
+        while table.running() and time.time() < deadline:
+            time.sleep(0.1)
+
+    assert [job.status for job in jobs] == [FINISHED, FINISHED], [job.error for job in jobs]
+    html_files = [name for name in os.listdir(tmp_path) if name.endswith(".html")]
+    saved = sum(job.counts["saved"] for job in jobs)
+    assert saved == sum(job.counts["found"] for job in jobs) - sum(job.counts["duplicates"] for job in jobs)
+    assert len(html_files) == saved
+    assert len(ArticleIndex(str(tmp_path)).articles) == saved
+    # The export of whichever crawl finished last covers the whole directory
+    with open(tmp_path / "parsed_articles.csv", encoding="utf-8", newline="") as file:
+        assert len(list(csv.DictReader(file))) == saved
+
+
+# A crawl whose export fails part-way must not lose rows when it is run again
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_rerun_after_export_error_exports_every_article(tmp_path, monkeypatch, pipelined):
+    slugs = list(COMMERCIAL_SEARCH.categories.values())[:1]
+    write = CsvExporter.write
+
+    def failing_write(self, record):
+        if self.rows == 12:
+            raise PermissionError("parsed_articles.csv is open in another program")
+        write(self, record)
+
+    with StandInServer(SiteConfig(slugs, 3, latency=0.01)) as server:
+        site = server.site_for(COMMERCIAL_SEARCH)
+        settings = CrawlSettings(site, list(site.categories)[:1], 3, str(tmp_path), export_format="CSV (.csv)",
+                                 parquet_label="All", pipelined=pipelined)
+        monkeypatch.setattr(CsvExporter, "write", failing_write)
+        failed = Job(1, "failing export")
+        failed.run(run_crawl, settings)
+        monkeypatch.setattr(CsvExporter, "write", write)
+        rerun = Job(2, "rerun")
+        rerun.run(run_crawl, settings)
+
+    assert failed.status == FAILED
+    assert rerun.status == FINISHED, rerun.error
+    assert not glob.glob(os.path.join(tmp_path, "parquet", "*", "*", ".*.tmp"))
+    assert len(pd.read_parquet(tmp_path / "parquet")) == 30
+    if not pipelined:  # A pipelined export only holds the rows of the run that wrote it
+        with open(tmp_path / "parsed_articles.csv", encoding="utf-8", newline="") as file:
+            assert len(list(csv.DictReader(file))) == 30
+
+
+# Function to count what a crawl left in its directory: (Parquet rows, CSV rows, temporary Parquet parts)
+def exported_counts(directory):
+    parquet = os.path.join(directory, "parquet")
+    rows = len(pd.read_parquet(parquet)) if os.path.isdir(parquet) else 0
+    with open(os.path.join(directory, "parsed_articles.csv"), encoding="utf-8", newline="") as file:
+        csv_rows = len(list(csv.DictReader(file)))
+    return rows, csv_rows, len(glob.glob(os.path.join(parquet, "*", "*", ".*.tmp")))
+
+
+# Function to crawl in a separate process (the target of the killed crawl)
+def crawl_in_process(settings):
+    Job(1, "killed").run(run_crawl, settings)
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_cancelled_crawl_resumes_without_losing_rows(tmp_path, pipelined):
+    slugs = list(COMMERCIAL_SEARCH.categories.values())[:1]
+    with StandInServer(SiteConfig(slugs, 3, latency=0.02)) as server:
+        site = server.site_for(COMMERCIAL_SEARCH)
+        settings = CrawlSettings(site, list(site.categories)[:1], 3, str(tmp_path), export_format="CSV (.csv)",
+                                 parquet_label="All", pipelined=pipelined, per_host_limit=2, max_rate=20)
+        cancelled = Job(1, "cancelled")
+
+        def cancel_after_ten():
+            while cancelled.counts["saved"] + cancelled.counts["parsed"] < 10 and cancelled.status != FINISHED:
+                time.sleep(0.01)
+            cancelled.cancel()
+
+        threading.Thread(target=cancel_after_ten, daemon=True).start()
+        cancelled.run(run_crawl, settings)
+        resumed = Job(2, "resumed")
+        resumed.run(run_crawl, settings)
+
+    assert cancelled.status == CANCELLED
+    assert resumed.status == FINISHED, resumed.error
+    assert resumed.counts["resumed"] >= 10
+    rows, csv_rows, temporary = exported_counts(tmp_path)
+    assert (rows, temporary) == (30, 0)
+    assert csv_rows == 30  # A resumed pipelined export writes the interrupted run's rows again from the journal
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_killed_crawl_resumes_without_refetching(tmp_path, pipelined):
+    slugs = list(COMMERCIAL_SEARCH.categories.values())[:1]
+    journal = tmp_path / ".crawl_journal.jsonl"
+    with StandInServer(SiteConfig(slugs, 3, latency=0.05)) as server:
+        site = server.site_for(COMMERCIAL_SEARCH)
+        settings = CrawlSettings(site, list(site.categories)[:1], 3, str(tmp_path), export_format="CSV (.csv)",
+                                 parquet_label="All", pipelined=pipelined, per_host_limit=2, max_rate=20,
+                                 use_http_cache=False)
+        process = multiprocessing.Process(target=crawl_in_process, args=(settings,))
+        process.start()
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            text = journal.read_text(encoding="utf-8") if journal.exists() else ""
+            if text.count('"stored"') + text.count('"exported"') >= 10:
+                break
+            time.sleep(0.01)
+        process.kill()
+        process.join()
+        resumed = Job(2, "resumed")
+        resumed.run(run_crawl, settings)
+
+    assert resumed.status == FINISHED, resumed.error
+    assert resumed.counts["resumed"] >= 10
+    # Only the articles the killed crawl had not stored are fetched again
+    assert resumed.counts["parsed" if pipelined else "saved"] == 30 - resumed.counts["resumed"]
+    rows, csv_rows, temporary = exported_counts(tmp_path)
+    assert (rows, csv_rows, temporary) == (30, 30, 0)
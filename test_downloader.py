@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+import downloader
+import http_client
+from downloader import (BACKOFF_FACTOR, MAX_RETRY_WAIT, RATE_INCREASE, RETRY_BACKOFF, SLOW_START_FACTOR,
+                        SLOWDOWN_FACTOR, HostLimiter, HostThrottle, fetch_article, parse_retry_after)
+from metrics import RunMetrics
+
+URL = "https://www.example.com/news/deal/"
+
+
+class FakeResponse:
+    def __init__(self, status_code, retry_after=None, text="<html>deal</html>"):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+        self.text = text
+        self.content = text.encode("utf-8")
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    """Answer requests from a list of FakeResponses (or exceptions), in order."""
+    queue = []
+
+    def get(link, headers=None, cache=None):
+        response = queue.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(http_client, "get", get)
+    return queue
+
+
+@pytest.fixture
+def pauses(monkeypatch):
+    """Record every wait instead of sleeping through it."""
+    waits = []
+
+    def pause(seconds, stop=None):
+        waits.append(round(seconds))
+        return not (stop is not None and stop.is_set())
+
+    monkeypatch.setattr(downloader, "_pause", pause)
+    return waits
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("86400") == MAX_RETRY_WAIT
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # A date in the past means now
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_throttled_response_halves_the_rate_and_pauses_the_host():
+    throttle = HostThrottle(2, rate=4.0)
+    throttle.record(429, 0.1, retry_after=30)
+    assert throttle.rate == 4.0 * BACKOFF_FACTOR
+    assert 29 < throttle._reserve() <= 30
+
+
+def test_fast_responses_raise_the_rate_slow_start_first():
+    throttle = HostThrottle(2, rate=4.0)
+    throttle.record(200, 0.1)
+    assert throttle.rate == pytest.approx(4.0 * SLOW_START_FACTOR)
+    throttle.record(503, 0.1)
+    rate = throttle.rate
+    throttle.record(200, 0.1)
+    assert throttle.rate == pytest.approx(rate + RATE_INCREASE)
+
+
+def test_slow_responses_lower_the_rate_and_errors_leave_it():
+    throttle = HostThrottle(2, rate=4.0)
+    throttle.record(200, 0.1)
+    rate = throttle.rate
+    throttle.record(500, 5.0)
+    assert throttle.rate == rate
+    throttle.record(200, 5.0)
+    assert throttle.rate == pytest.approx(rate * SLOWDOWN_FACTOR)
+
+
+def test_rate_stays_within_its_bounds():
+    throttle = HostThrottle(2, rate=1.0, min_rate=0.5, max_rate=1.05)
+    for _ in range(5):
+        throttle.record(429)
+    assert throttle.rate == 0.5
+    throttle = HostThrottle(2, rate=1.0, min_rate=0.5, max_rate=1.05)
+    for _ in range(5):
+        throttle.record(200, 0.1)
+    assert throttle.rate == 1.05
+
+
+def test_failed_requests_are_retried_after_retry_after_or_backoff(responses, pauses):
+    responses.extend([FakeResponse(503, "7"), FakeResponse(500), FakeResponse(200)])
+    metrics = RunMetrics()
+    assert fetch_article(URL, HostLimiter(2), metrics=metrics) == ("<html>deal</html>", None)
+    # The 503 pauses the host until its Retry-After; the 500 backs off this request only
+    assert 7 in pauses and round(RETRY_BACKOFF * 2) in pauses
+    assert metrics.to_dict()["counts"]["retries"] == 2
+
+
+def test_connection_errors_are_retried(responses, pauses):
+    responses.extend([downloader.requests.ConnectionError("reset"), FakeResponse(200)])
+    assert fetch_article(URL, HostLimiter(2)) == ("<html>deal</html>", None)
+
+
+def test_other_statuses_are_not_retried(responses, pauses):
+    responses.extend([FakeResponse(404), FakeResponse(200)])
+    text, error = fetch_article(URL, HostLimiter(2))
+    assert text is None and "404" in error
+    assert len(responses) == 1
+
+
+def test_retries_end_after_max_retries(responses, pauses):
+    responses.extend([FakeResponse(502) for _ in range(3)])
+    text, error = fetch_article(URL, HostLimiter(2), retries=2)
+    assert text is None and "502" in error
+    assert not responses
+
+
+def test_retries_end_once_they_would_pass_max_retry_time(responses, pauses):
+    responses.extend([FakeResponse(500, "120"), FakeResponse(200)])
+    metrics = RunMetrics()
+    text, error = fetch_article(URL, HostLimiter(2), metrics=metrics, max_retry_time=60)
+    assert text is None and "500" in error
+    assert len(responses) == 1
+    assert metrics.to_dict()["counts"]["retries given up"] == 1
+
+
+def test_stop_event_ends_a_retry_wait_at_once(responses):
+    responses.extend([FakeResponse(500, "120"), FakeResponse(200)])
+    stop = threading.Event()
+    threading.Timer(0.2, stop.set).start()  # Cancelled while waiting out the 120 s Retry-After
+    started = time.monotonic()
+    text, error = fetch_article(URL, HostLimiter(2), stop=stop)
+    assert text is None and "stopped" in error
+    assert time.monotonic() - started < 5
+    assert len(responses) == 1
@@ -1,5 +1,5 @@
 import os
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import time
 import re
@@ -12,10 +12,7 @@ ASSET_TYPE_KEYWORDS = ["Office", "Industrial", "Retail", "Medical Office", "Cowo
 # Function to scrape links
 def scrape_links(url, css_selector):
     """Scrape links based on the provided URL and CSS selector."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
-    }
-    response = requests.get(url, headers=headers)
+    response = http_client.get(url)
     if response.status_code != 200:
         st.error(f"Failed to fetch page: {url}, status code: {response.status_code}")
         return []
@@ -38,10 +35,7 @@ def clean_filename(url, unique_suffix):
 # Function to save HTML content
 def save_html_content(link, directory, unique_suffix):
     """Save HTML content of a given link to a file."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
-    }
-    response = requests.get(link, headers=headers)
+    response = http_client.get(link)
     if response.status_code != 200:
         st.error(f"Failed to fetch article: {link}, status code: {response.status_code}")
         return
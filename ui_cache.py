@@ -0,0 +1,134 @@
+import os
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from site_engine import SiteEngine
+from sites import SITES
+
+# How long cached listing results, exports and previews stay valid (seconds)
+CACHE_TTL = 6 * 60 * 60
+
+# Session state entry holding the latest finished run of this browser session
+RESULT_KEY = "last_result"
+
+
+# Function to get the crawl date used in cache keys
+def crawl_date():
+    """Return today's date; results cached on an earlier day are never reused."""
+    return date.today().isoformat()
+
+
+# Function to build the key of a run
+def run_key(categories, pages):
+    """Key results on the categories, page count and crawl date."""
+    return (tuple(categories), int(pages), crawl_date())
+
+
+@st.cache_resource
+def site_engine(site_name):
+    """One SiteEngine per site and process, so every session shares its host limits."""
+    return SiteEngine(SITES[site_name])
+
+
+class IncompleteListing(Exception):
+    """Raised out of a cached listing function so a listing with errors or no articles is never cached.
+
+    `result` is what the listing did find, for the caller to use this once.
+    """
+
+    def __init__(self, result, errors):
+        super().__init__(f"Listing found {len(result)} articles with {len(errors)} errors")
+        self.result = result
+        self.errors = errors
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_frontier(_engine, site_name, categories, pages, day):
+    """Listing results of `categories` as `(frontier, errors)`; `_engine` is not part of the key.
+
+    Only complete listings are cached; anything else raises IncompleteListing.
+    """
+    frontier, errors = _engine.crawl_categories(list(categories), pages)
+    if errors or not len(frontier):
+        raise IncompleteListing(frontier, errors)
+    return frontier, errors
+
+
+# Function to list categories through the listing cache
+def listing_frontier(engine, site_name, categories, pages):
+    """Return `(frontier, errors)` from the cache, listing again whenever the last attempt was incomplete."""
+    try:
+        return cached_frontier(engine, site_name, tuple(categories), pages, crawl_date())
+    except IncompleteListing as listing:
+        return listing.result, listing.errors
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_file_bytes(path, modified):
+    """Contents of an export file; `modified` (its mtime) makes a rewritten file a new entry."""
+    with open(path, "rb") as file:
+        return file.read()
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_export_frame(path, modified):
+    """The exported rows as a DataFrame, for previewing a finished run."""
+    if str(path).lower().endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+
+# Function to remember the result of a finished run
+def remember_result(key, **result):
+    """Store a run's result in the session so reruns (e.g. a download click) still show it."""
+    st.session_state[RESULT_KEY] = {"key": key, **result}
+
+
+# Function to look up the result of the latest run
+def last_result():
+    """Return the latest run's result, or None when there is none or its crawl date has passed."""
+    result = st.session_state.get(RESULT_KEY)
+    if result and result["key"][-1] != crawl_date():
+        return None
+    return result
+
+
+# Function to drop every cached result
+def clear_cached_results():
+    """Invalidate the listing, export and preview caches and forget the session's last run."""
+    cached_frontier.clear()
+    cached_file_bytes.clear()
+    cached_export_frame.clear()
+    st.session_state.pop(RESULT_KEY, None)
+
+
+# Function to show the cache controls
+def cache_controls(*extra_clears):
+    """Sidebar button that invalidates the cached results; `extra_clears` are called as well."""
+    if st.sidebar.button("Clear cached results"):
+        clear_cached_results()
+        for clear in extra_clears:
+            clear()
+        st.sidebar.success("Cached results cleared.")
+
+
+# Function to show the latest run's export
+def show_result(result):
+    """Show a finished run's summary, preview and download button from the caches."""
+    path = result["export_file"]
+    if not os.path.exists(path):
+        return
+    modified = os.path.getmtime(path)
+    st.success(result.get("message", "Scraping and parsing completed successfully!"))
+    if result.get("mismatches"):
+        st.warning(f"The parser backend differs from html.parser on {len(result['mismatches'])} fields:")
+        st.dataframe(result["mismatches"])
+    st.dataframe(cached_export_frame(path, modified))
+    st.download_button(
+        label=result["label"],
+        data=cached_file_bytes(path, modified),
+        file_name=result["file_name"],
+        mime=result["mime"]
+    )
@@ -0,0 +1,124 @@
+import json
+import time
+
+import pandas as pd
+import streamlit as st
+
+from jobs import CANCELLED, DONE_STATES, FAILED, FINISHED, JobTable, format_seconds
+from ui_cache import remember_result
+
+# How often the job panel polls the job table (seconds); progress reaches the browser at this rate
+POLL_INTERVAL = 2
+
+# Number of recent jobs and log lines the panel shows
+JOBS_SHOWN = 5
+LOG_TAIL = 20
+
+# Session state entry mapping the ids of this session's jobs to their run keys
+WATCHED_KEY = "watched_jobs"
+
+
+@st.cache_resource
+def job_table():
+    """One JobTable per server process, so jobs keep running across reruns, sessions and closed tabs."""
+    return JobTable()
+
+
+# Function to start a background job from the UI
+def start_job(key, title, fn, *args, **kwargs):
+    """Queue `fn(job, *args, **kwargs)` and remember its result under `key` (see run_key) when it finishes."""
+    job = job_table().submit(title, fn, *args, **kwargs)
+    st.session_state.setdefault(WATCHED_KEY, {})[job.id] = key
+    return job
+
+
+# Function to convert seconds for display
+def to_milliseconds(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+# Function to show a run's performance metrics
+def show_metrics(metrics, key, downloadable=False):
+    """Per-stage latency table, status codes and counters of a RunMetrics dict (see metrics.py)."""
+    stages = metrics["stages"]
+    if stages:
+        st.dataframe(pd.DataFrame([
+            {
+                "Stage": stage, "Samples": stats["count"], "Total (s)": round(stats["total_seconds"], 2),
+                "Mean (ms)": to_milliseconds(stats["mean_seconds"]), "p50 (ms)": to_milliseconds(stats["p50_seconds"]),
+                "p90 (ms)": to_milliseconds(stats["p90_seconds"]), "p99 (ms)": to_milliseconds(stats["p99_seconds"]),
+                "Max (ms)": to_milliseconds(stats["max_seconds"]), "MB": round(stats["bytes"] / 1e6, 2),
+            }
+            for stage, stats in sorted(stages.items())
+        ]), hide_index=True)
+        # Totals add up across threads, so compare stages with each other rather than with the elapsed time
+        slowest = max(stages, key=lambda stage: stages[stage]["total_seconds"])
+        st.caption(f"Most time spent in: {slowest}")
+    counters = {**{f"HTTP {code}": count for code, count in metrics["status_codes"].items()}, **metrics["counts"]}
+    columns = st.columns(len(counters))
+    for column, (name, value) in zip(columns, counters.items()):
+        column.metric(name[0].upper() + name[1:], value)
+    if downloadable:
+        st.download_button(
+            "Download metrics (JSON)", json.dumps(metrics, indent=2), file_name=f"metrics-{key}.json",
+            mime="application/json", key=f"metrics-{key}"
+        )
+
+
+# Function to show one job
+def show_job(job):
+    """Show a job's status, progress bar, counts, ETA and recent log lines."""
+    state = job.snapshot()
+    st.markdown(f"**{state['title']}** ({state['status']})")
+    if state["status"] not in DONE_STATES:
+        done, total = state["done"], state["total"]
+        fraction = min(done / total, 1.0) if total else 0.0
+        text = f"{state['stage']}: {done}/{total}" if total else f"{state['stage']}..."
+        st.progress(fraction, text=text)
+        if st.button("Cancel", key=f"cancel-job-{state['id']}"):
+            job.cancel()
+    if state["counts"]:
+        columns = st.columns(len(state["counts"]))
+        for column, (name, value) in zip(columns, sorted(state["counts"].items())):
+            column.metric(name.capitalize(), value)
+    if state["started"]:
+        elapsed = (state["finished"] or time.time()) - state["started"]
+        eta = f", about {format_seconds(state['eta'])} left in this stage" if state["eta"] is not None else ""
+        st.caption(f"Elapsed {format_seconds(elapsed)}{eta}")
+    if state["status"] == FAILED:
+        st.error(f"An error occurred: {state['error']}")
+    if state["status"] in (FAILED, CANCELLED):
+        st.caption("Starting the same crawl again within a day resumes where this one stopped; "
+                   "tick \"Start fresh\" to start over instead.")
+    if state["metrics"]:
+        with st.expander("Performance metrics"):
+            show_metrics(state["metrics"], state["id"], downloadable=state["status"] in DONE_STATES)
+    if state["log"]:
+        with st.expander("Log"):
+            for _, level, message in state["log"][-LOG_TAIL:]:
+                getattr(st, level)(message)
+
+
+# Function to show the job panel
+@st.fragment(run_every=POLL_INTERVAL)
+def job_panel():
+    """Poll the job table; only this fragment reruns, so the rest of the page stays responsive.
+
+    When a job started by this session finishes, its result is remembered
+    (see ui_cache.remember_result) and the whole page reruns to show it.
+    """
+    jobs = job_table().jobs()[:JOBS_SHOWN]
+    if jobs:
+        st.subheader("Crawl jobs")
+    for job in jobs:
+        show_job(job)
+
+    watched = st.session_state.get(WATCHED_KEY, {})
+    finished = {job_id: job_table().get(job_id) for job_id in watched}
+    finished = {job_id: job for job_id, job in finished.items() if job is None or job.status in DONE_STATES}
+    if finished:
+        for job_id, job in finished.items():
+            key = watched.pop(job_id)
+            if job is not None and job.status == FINISHED and job.result:
+                remember_result(key, **job.result)
+        st.rerun()